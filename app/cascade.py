@@ -0,0 +1,221 @@
+"""
+Confidence-Gated Model Cascade
+Cheap unigram first stage with escalation to the full EmailClassifier
+"""
+
+import re
+import threading
+
+import numpy as np
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+_EMAIL_RE = re.compile(r'\S+@\S+')
+_URL_RE = re.compile(r'http\S+|www\S+')
+
+
+def _fast_preprocess(text):
+    """Lowercase and strip emails/URLs; no stopword removal or lemmatization."""
+    if not isinstance(text, str):
+        text = str(text)
+    text = text.lower()
+    text = _EMAIL_RE.sub('', text)
+    return _URL_RE.sub('', text)
+
+
+class CascadeClassifier:
+    """
+    Two-tier classifier in front of an EmailClassifier.
+    
+    The first stage is distilled from the full model without retraining:
+    it keeps only the unigram columns of the TF-IDF vocabulary and their
+    coefficients, and tokenizes with a single regex instead of the
+    stopword filter and WordNet lemmatizer. Emails whose first-stage
+    confidence is below the threshold are escalated to the full
+    TF-IDF + LogisticRegression path.
+    """
+    
+    def __init__(self, classifier, threshold=0.9):
+        """
+        Build the first stage from a loaded classifier.
+        
+        Args:
+            classifier: Loaded EmailClassifier used for escalations
+            threshold: Minimum first-stage probability to accept its label
+        """
+        self.classifier = classifier
+        self.threshold = threshold
+        self.classes = np.asarray(classifier.model.classes_)
+        
+        vocabulary = classifier.vectorizer.vocabulary_
+        unigrams = sorted((index, term) for term, index in vocabulary.items() if ' ' not in term)
+        columns = np.array([index for index, _ in unigrams])
+        
+        # Stopwords and words of <= 2 letters never appear in the vocabulary
+        self.vectorizer = TfidfVectorizer(
+            vocabulary={term: i for i, (_, term) in enumerate(unigrams)},
+            preprocessor=_fast_preprocess,
+            token_pattern=r'(?u)\b[a-z]{3,}\b',
+            dtype=np.float32
+        )
+        self.vectorizer.idf_ = np.asarray(classifier.vectorizer.idf_, dtype=np.float32)[columns]
+        self.coef = np.asarray(classifier.model.coef_[:, columns], dtype=np.float32).T
+        self.intercept = np.asarray(classifier.model.intercept_, dtype=np.float32)
+        
+        self._lock = threading.Lock()
+        self.reset_stats()
+    
+    def reset_stats(self):
+        """Clear the per-tier counters."""
+        with self._lock:
+            self._stats = {'total': 0, 'fast': 0, 'full': 0}
+    
+    def get_stats(self):
+        """
+        Per-tier hit rates since the last reset.
+        
+        Returns:
+            dict: Counts and hit rates of the fast and full tiers
+        """
+        with self._lock:
+            stats = dict(self._stats)
+        total = stats['total'] or 1
+        return {
+            'threshold': self.threshold,
+            'total': stats['total'],
+            'fast': stats['fast'],
+            'full': stats['full'],
+            'fast_rate': round(stats['fast'] / total, 4),
+            'full_rate': round(stats['full'] / total, 4)
+        }
+    
+    def first_stage_proba(self, emails):
+        """
+        First-stage class probabilities for a list of emails.
+        
+        Returns:
+            Tuple of (probabilities of shape (n_emails, n_classes) in
+            classifier.model.classes_ order, boolean mask of emails with at
+            least one known unigram)
+        """
+        text_vectorized = self.vectorizer.transform(emails)
+        logits = text_vectorized @ self.coef + self.intercept
+        logits -= logits.max(axis=1, keepdims=True)
+        np.exp(logits, out=logits)
+        logits /= logits.sum(axis=1, keepdims=True)
+        return logits, np.diff(text_vectorized.indptr) > 0
+    
+    def _fast_result(self, probabilities):
+        """Build a prediction dict in the EmailClassifier.predict format."""
+        best = int(np.argmax(probabilities))
+        return {
+            'success': True,
+            'predicted_category': str(self.classes[best]),
+            'confidence': round(float(probabilities[best]) * 100, 2),
+            'confidence_scores': {
+                str(cat): round(float(prob) * 100, 2)
+                for cat, prob in zip(self.classes, probabilities)
+            },
+            'tier': 'fast'
+        }
+    
+    def predict_batch(self, emails, explain=False, top_k=5):
+        """
+        Predict categories, escalating low-confidence emails to the full model.
+        
+        Args:
+            emails: List of email texts
+            explain: Escalate every email so the full model can explain it
+            top_k: Number of n-grams to return when explain is set
+            
+        Returns:
+            List of prediction results; each successful result has a 'tier'
+            of 'fast' or 'full'
+        """
+        proba, matched = self.first_stage_proba(emails)
+        # Emails without any known unigram would be decided by the intercept alone
+        accept = matched & (proba.max(axis=1) >= self.threshold)
+        if explain:
+            accept[:] = False
+        
+        monitor = self.classifier.monitor
+        results = []
+        for email, probabilities, accepted in zip(emails, proba, accept):
+            if accepted:
+                results.append(self._fast_result(probabilities))
+                # Fast-tier text is not lemmatized, so it is left out of the OOV stats
+                if monitor is not None:
+                    monitor.record(None, results[-1]['predicted_category'], float(probabilities.max()))
+            else:
+                result = self.classifier.predict(email, explain=explain, top_k=top_k)
+                if result['success']:
+                    result['tier'] = 'full'
+                results.append(result)
+        
+        fast = int(accept.sum())
+        with self._lock:
+            self._stats['total'] += len(emails)
+            self._stats['fast'] += fast
+            self._stats['full'] += len(emails) - fast
+        
+        return results
+    
+    def predict_lean(self, emails, include_probabilities=True):
+        """
+        Lean (array) predictions through the cascade.
+        
+        Accepted emails take their label and probabilities from the first
+        stage; the rest are escalated together in one
+        EmailClassifier.predict_lean call.
+        
+        Returns:
+            dict: Same format as EmailClassifier.predict_lean
+        """
+        proba, matched = self.first_stage_proba(emails)
+        accept = matched & (proba.max(axis=1) >= self.threshold)
+        escalated = np.flatnonzero(~accept)
+        
+        classes = [str(c) for c in self.classes]
+        labels = [None] * len(emails)
+        probabilities = np.full((len(emails), len(classes)), np.nan)
+        
+        if len(escalated):
+            result = self.classifier.predict_lean([emails[i] for i in escalated],
+                                                  include_probabilities=include_probabilities)
+            if not result['success']:
+                return result
+            for i, label in zip(escalated, result['labels']):
+                labels[i] = label
+            if include_probabilities:
+                probabilities[escalated] = result['probabilities']
+        
+        monitor = self.classifier.monitor
+        fast_proba = proba[accept]
+        for i, k in zip(np.flatnonzero(accept), fast_proba.argmax(axis=1)):
+            labels[i] = classes[k]
+        if monitor is not None and len(fast_proba):
+            monitor.record_many(None, [labels[i] for i in np.flatnonzero(accept)], fast_proba.max(axis=1))
+        
+        fast = int(accept.sum())
+        with self._lock:
+            self._stats['total'] += len(emails)
+            self._stats['fast'] += fast
+            self._stats['full'] += len(emails) - fast
+        
+        result = {
+            'success': True,
+            'classes': classes,
+            'labels': labels
+        }
+        if include_probabilities:
+            probabilities[accept] = fast_proba
+            result['probabilities'] = probabilities.round(4)
+        return result
+    
+    def predict(self, email_text, explain=False, top_k=5):
+        """
+        Predict the category of a single email through the cascade.
+        
+        Returns:
+            dict: Same format as EmailClassifier.predict plus 'tier'
+        """
+        return self.predict_batch([email_text], explain=explain, top_k=top_k)[0]
@@ -0,0 +1,141 @@
+"""
+Model Compression Tool
+Prunes low-impact vocabulary entries and stores coefficients at reduced precision
+
+Usage:
+    python -m app.compression --min-weight 1.0 --dtype float16 --output models/compressed
+"""
+
+import argparse
+import copy
+import os
+import pickle
+
+import numpy as np
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+MODEL_FILENAME = 'email_classifier_model.pkl'
+VECTORIZER_FILENAME = 'tfidf_vectorizer.pkl'
+
+SUPPORTED_DTYPES = ('float64', 'float32', 'float16')
+
+
+def feature_impact(model):
+    """
+    Largest change a feature can make to the class logits.
+    
+    Softmax is invariant to adding the same value to every class logit, so
+    what matters is the spread of a feature's weights across classes, not
+    their magnitude. TF-IDF rows are L2-normalized, so no feature value
+    exceeds 1 and the spread bounds its effect on the prediction.
+    
+    Returns:
+        ndarray of shape (n_features,)
+    """
+    coef = model.coef_
+    if coef.shape[0] == 1:
+        return np.abs(coef[0])
+    return np.ptp(coef, axis=0)
+
+
+def compress(model, vectorizer, min_weight=1.0, dtype='float16'):
+    """
+    Build pruned, reduced-precision copies of the model and vectorizer.
+    
+    Args:
+        model: Fitted LogisticRegression
+        vectorizer: Fitted TfidfVectorizer
+        min_weight: Drop features whose impact is below this value
+        dtype: Storage dtype for coef_, intercept_ and idf_
+        
+    Returns:
+        Tuple of (model, vectorizer, kept feature mask)
+    """
+    if dtype not in SUPPORTED_DTYPES:
+        raise ValueError(f"dtype must be one of {SUPPORTED_DTYPES}")
+    
+    keep = feature_impact(model) >= min_weight
+    
+    # Re-index the kept terms in their original column order
+    old_to_new = np.cumsum(keep) - 1
+    vocabulary = {
+        term: int(old_to_new[index])
+        for term, index in vectorizer.vocabulary_.items()
+        if keep[index]
+    }
+    
+    # Fresh vectorizer with the same settings and a fixed vocabulary; stop_words_
+    # (terms dropped during fitting) is not needed for transform.
+    # Computation happens in float32; float16 is storage only
+    params = vectorizer.get_params()
+    params.update(vocabulary=vocabulary, dtype=np.float32)
+    compressed_vectorizer = TfidfVectorizer(**params)
+    compressed_vectorizer.idf_ = vectorizer.idf_[keep].astype(dtype)
+    
+    compressed_model = copy.deepcopy(model)
+    compressed_model.coef_ = model.coef_[:, keep].astype(dtype)
+    compressed_model.intercept_ = model.intercept_.astype(dtype)
+    compressed_model.n_features_in_ = len(vocabulary)
+    
+    return compressed_model, compressed_vectorizer, keep
+
+
+def save(model, vectorizer, output_dir):
+    """
+    Pickle the compressed artifacts in the layout EmailClassifier expects.
+    
+    EmailClassifier upcasts float16 parameters to float32 when loading.
+    
+    Returns:
+        Tuple of (model path, vectorizer path)
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    model_path = os.path.join(output_dir, MODEL_FILENAME)
+    vectorizer_path = os.path.join(output_dir, VECTORIZER_FILENAME)
+    with open(model_path, 'wb') as f:
+        pickle.dump(model, f, protocol=pickle.HIGHEST_PROTOCOL)
+    with open(vectorizer_path, 'wb') as f:
+        pickle.dump(vectorizer, f, protocol=pickle.HIGHEST_PROTOCOL)
+    return model_path, vectorizer_path
+
+
+def main():
+    """Compress the default model files and print a size report."""
+    base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    models_dir = os.path.join(base_dir, 'models')
+    
+    parser = argparse.ArgumentParser(description="Prune and quantize the email classifier")
+    parser.add_argument('--model', default=os.path.join(models_dir, MODEL_FILENAME))
+    parser.add_argument('--vectorizer', default=os.path.join(models_dir, VECTORIZER_FILENAME))
+    parser.add_argument('--output', default=os.path.join(models_dir, 'compressed'))
+    parser.add_argument('--min-weight', type=float, default=1.0,
+                        help="Drop features whose weight spread across classes is below this")
+    parser.add_argument('--dtype', choices=SUPPORTED_DTYPES, default='float16')
+    args = parser.parse_args()
+    
+    with open(args.model, 'rb') as f:
+        model = pickle.load(f)
+    with open(args.vectorizer, 'rb') as f:
+        vectorizer = pickle.load(f)
+    
+    compressed_model, compressed_vectorizer, keep = compress(
+        model, vectorizer, min_weight=args.min_weight, dtype=args.dtype
+    )
+    model_path, vectorizer_path = save(compressed_model, compressed_vectorizer, args.output)
+    
+    original_size = os.path.getsize(args.model) + os.path.getsize(args.vectorizer)
+    compressed_size = os.path.getsize(model_path) + os.path.getsize(vectorizer_path)
+    
+    print("="*60)
+    print("🗜️ MODEL COMPRESSION")
+    print("="*60)
+    print(f"   Features kept: {keep.sum():,} / {len(keep):,} (min weight {args.min_weight})")
+    print(f"   Precision:     {args.dtype}")
+    print(f"   Size on disk:  {original_size / 1024:.1f} KB -> {compressed_size / 1024:.1f} KB "
+          f"({(1 - compressed_size / original_size) * 100:.1f}% smaller)")
+    print(f"\n✅ Saved to {args.output}")
+    print(f"   Load with: EmailClassifier(model_path='{model_path}', vectorizer_path='{vectorizer_path}')")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Training Data Pipeline
+Milestone 1 - Activities 1.4 to 3.1 of the notebook as reusable functions
+(keyword labeling lives in labeling.py)
+"""
+
+import os
+
+import pandas as pd
+from sklearn.model_selection import train_test_split
+
+from .dedup import deduplicate
+from .labeling import KeywordLabeler
+
+
+def extract_email_body(message):
+    """
+    Extract the body content from raw email message.
+    Email body starts after the headers (separated by double newline).
+    """
+    try:
+        if pd.isna(message):
+            return ''
+        parts = str(message).split('\n\n', 1)
+        if len(parts) > 1:
+            return parts[1].strip()
+        return str(message).strip()
+    except Exception:
+        return ''
+
+
+def drop_near_duplicates(df, column='email_body', threshold=0.8):
+    """
+    Keep one email per near-duplicate cluster (first occurrence).
+    
+    Extends the notebook's exact drop_duplicates to newsletters sent to
+    different recipients, reply chains and similar near-identical mail.
+    
+    Args:
+        df: DataFrame with a text column
+        column: Column to compare
+        threshold: Minimum estimated Jaccard similarity to count as duplicate
+        
+    Returns:
+        Tuple of (filtered DataFrame, report dict from dedup.deduplicate)
+    """
+    _, representatives, report = deduplicate(df[column].tolist(), threshold)
+    return df.iloc[representatives], report
+
+
+def prepare_dataset(csv_path, preprocess, near_duplicate_threshold=None, n_jobs=1):
+    """
+    Rebuild the notebook's cleaned and labeled dataset from the Enron CSV.
+    
+    Args:
+        csv_path: Path to the Kaggle emails.csv file
+        preprocess: Text preprocessing function (e.g. EmailClassifier.preprocess_text)
+        near_duplicate_threshold: Also drop near-duplicates at this Jaccard
+            similarity (None keeps the notebook's exact-duplicate behaviour)
+        n_jobs: Worker processes for keyword labeling (-1 for all CPUs)
+        
+    Returns:
+        DataFrame with email_body, category and clean_text columns
+    """
+    if not os.path.exists(csv_path):
+        raise FileNotFoundError(f"Dataset not found: {csv_path}")
+    
+    df = pd.read_csv(csv_path)
+    
+    # Activity 1.4: Extract body and label
+    df['email_body'] = df['message'].apply(extract_email_body)
+    df['category'] = KeywordLabeler().label_many(df['email_body'], n_jobs=n_jobs)
+    
+    # Activity 1.5 - 1.7: Missing values, duplicates, very short emails
+    df = df[df['email_body'].str.len() > 0]
+    df = df.dropna(subset=['email_body'])
+    df = df.drop_duplicates(subset=['email_body'], keep='first')
+    df = df[df['email_body'].str.len() >= 50]
+    if near_duplicate_threshold is not None:
+        df, _ = drop_near_duplicates(df, 'email_body', near_duplicate_threshold)
+    
+    # Activity 3.1: Preprocess and drop empty results
+    df['clean_text'] = df['email_body'].apply(preprocess)
+    df = df[df['clean_text'].str.len() > 0]
+    
+    return df.reset_index(drop=True)
+
+
+def notebook_split(df):
+    """
+    Reproduce the notebook's train/test split (Activity 4.1).
+    
+    The split only depends on the number of rows and the labels, so
+    splitting the texts gives the same rows as splitting the TF-IDF matrix.
+    
+    Returns:
+        Tuple of (train_texts, test_texts, train_labels, test_labels)
+    """
+    return train_test_split(
+        df['clean_text'], df['category'],
+        test_size=0.3, random_state=42, stratify=df['category']
+    )
@@ -0,0 +1,309 @@
+"""
+Near-Duplicate Detection
+MinHash / LSH index that clusters near-identical emails so only one
+representative per cluster needs to be classified
+"""
+
+import re
+import time
+import zlib
+from itertools import chain
+
+import numpy as np
+
+_TOKEN_RE = re.compile(r'[a-z0-9]+')
+
+# Odd 64-bit multiplier used to mix word hashes into shingle hashes
+_SHINGLE_MULTIPLIER = np.uint64(0x9E3779B97F4A7C15)
+_SHIFT = np.uint64(32)
+
+
+def _lsh_bands(threshold, num_perm):
+    """
+    Pick (bands, rows) so the LSH S-curve rises just below the threshold.
+    
+    A pair with Jaccard similarity s becomes a candidate with probability
+    1 - (1 - s^rows)^bands, whose midpoint is about (1 / bands)^(1 / rows).
+    The highest midpoint not above the threshold is chosen: candidates are
+    verified against their signatures anyway, so erring towards more
+    candidates only costs comparisons while erring the other way misses
+    duplicates.
+    """
+    options = []
+    for rows in range(1, num_perm + 1):
+        if num_perm % rows == 0:
+            bands = num_perm // rows
+            options.append(((1.0 / bands) ** (1.0 / rows), bands, rows))
+    below = [option for option in options if option[0] <= threshold]
+    _, bands, rows = max(below) if below else min(options)
+    return bands, rows
+
+
+class NearDuplicateIndex:
+    """
+    Greedy MinHash / LSH clustering of near-duplicate texts.
+    
+    Texts are shingled into word n-grams and summarized by MinHash
+    signatures, computed for a whole batch in array operations. Only
+    cluster representatives are indexed: each new text is compared with the
+    representatives sharing an LSH bucket and joins the first whose
+    estimated Jaccard similarity reaches the threshold, otherwise it
+    becomes a new representative. Because members are never
+    indexed, clusters cannot chain across dissimilar texts.
+    """
+    
+    def __init__(self, threshold=0.8, num_perm=128, shingle_size=3, seed=42):
+        """
+        Args:
+            threshold: Minimum estimated Jaccard similarity to join a cluster
+            num_perm: Number of MinHash permutations (signature length)
+            shingle_size: Words per shingle
+            seed: Seed of the hash permutations
+        """
+        if not 0.0 < threshold <= 1.0:
+            raise ValueError("threshold must be in (0, 1]")
+        
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self.bands, self.rows = _lsh_bands(threshold, num_perm)
+        
+        # Multiply-add-shift hashing of 32-bit keys: h(x) = (a * x + b) >> 32
+        rng = np.random.RandomState(seed)
+        self._a = rng.randint(0, 1 << 63, size=num_perm, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+        self._b = rng.randint(0, 1 << 63, size=num_perm, dtype=np.uint64)
+        
+        self.signatures = []
+        self._buckets = [{} for _ in range(self.bands)]
+    
+    def shingle_hashes(self, texts):
+        """
+        Hashed word n-grams of a list of texts.
+        
+        Each distinct word is hashed once with crc32 and each n-gram hash is mixed from
+        its word hashes in one array operation over the whole batch. Texts
+        with fewer words than shingle_size are padded, so every text has at
+        least one shingle. Repeated shingles are kept; they do not change
+        the MinHash minimum.
+        
+        Returns:
+            Tuple of (32-bit shingle hashes of all texts concatenated, as
+            uint64, and the offset of each text's first shingle)
+        """
+        k = self.shingle_size
+        # Word ids within the batch; id 0 pads texts shorter than k words
+        vocabulary = {'': 0}
+        rows = []
+        for text in texts:
+            ids = [vocabulary.setdefault(token, len(vocabulary))
+                   for token in _TOKEN_RE.findall(str(text).lower())]
+            if len(ids) < k:
+                ids.extend([0] * (k - len(ids)))
+            rows.append(ids)
+        
+        word_hashes = np.fromiter(
+            (zlib.crc32(word.encode('utf-8')) + 1 if word else 0 for word in vocabulary),
+            dtype=np.uint64, count=len(vocabulary)
+        )
+        lengths = np.fromiter((len(row) for row in rows), dtype=np.intp, count=len(rows))
+        ids = np.fromiter(chain.from_iterable(rows), dtype=np.intp, count=int(lengths.sum()))
+        tokens = word_hashes[ids]
+        n_windows = len(tokens) - k + 1
+        
+        # Polynomial mix of the k word hashes of every window, wrapping in uint64
+        with np.errstate(over='ignore'):
+            mixed = tokens[:n_windows].copy()
+            for j in range(1, k):
+                mixed = mixed * _SHINGLE_MULTIPLIER + tokens[j:j + n_windows]
+        
+        # Keep windows that lie within a single text
+        starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+        position = np.arange(n_windows) - np.repeat(starts, lengths)[:n_windows]
+        valid = position <= np.repeat(lengths - k, lengths)[:n_windows]
+        
+        counts = lengths - k + 1
+        offsets = np.concatenate(([0], np.cumsum(counts)[:-1]))
+        return mixed[valid] >> _SHIFT, offsets
+    
+    def signatures_of(self, texts, chunk_size=4096):
+        """
+        MinHash signatures of a list of texts, computed batch-wise.
+        
+        Shingle hashes are permuted in chunks of about chunk_size shingles,
+        small enough for the (num_perm, chunk) array to stay in cache, and
+        reduced to per-text minima with np.minimum.reduceat.
+        
+        Returns:
+            ndarray of shape (len(texts), num_perm) and dtype uint64
+        """
+        signatures = np.empty((len(texts), self.num_perm), dtype=np.uint64)
+        if not len(texts):
+            return signatures
+        hashed, offsets = self.shingle_hashes(texts)
+        ends = np.append(offsets[1:], len(hashed))
+        
+        first = 0
+        while first < len(texts):
+            last = max(int(np.searchsorted(ends, offsets[first] + chunk_size, side='right')), first + 1)
+            chunk = hashed[offsets[first]:ends[last - 1]]
+            # uint64 overflow wraps, which is the intended mod 2**64
+            with np.errstate(over='ignore'):
+                values = np.multiply.outer(self._a, chunk)
+                values += self._b[:, None]
+            # The shift is monotonic, so it is applied after the reduction
+            signatures[first:last] = np.minimum.reduceat(
+                values, offsets[first:last] - offsets[first], axis=1).T >> _SHIFT
+            first = last
+        return signatures
+    
+    def signature(self, text):
+        """
+        MinHash signature of a text.
+        
+        Returns:
+            ndarray of shape (num_perm,) and dtype uint64
+        """
+        return self.signatures_of([text])[0]
+    
+    def band_keys(self, signatures):
+        """
+        LSH bucket key of every band of a batch of signatures.
+        
+        The rows of a band are combined into one integer with a wrapping
+        polynomial hash; a collision only adds a candidate, which is then
+        verified against the full signature.
+        
+        Returns:
+            ndarray of shape (n_signatures, bands) and dtype uint64
+        """
+        bands = signatures.reshape(len(signatures), self.bands, self.rows)
+        with np.errstate(over='ignore'):
+            keys = bands[:, :, 0].copy()
+            for r in range(1, self.rows):
+                keys *= _SHINGLE_MULTIPLIER
+                keys += bands[:, :, r]
+        return keys
+    
+    def add_signature(self, signature, keys=None):
+        """
+        Assign a signature to a cluster, creating one if no representative is similar enough.
+        
+        Args:
+            signature: MinHash signature
+            keys: Its band keys (computed if omitted)
+        
+        Returns:
+            Tuple of (cluster id, whether a new cluster was created)
+        """
+        if keys is None:
+            keys = self.band_keys(signature[None, :])[0].tolist()
+        
+        seen = set()
+        for bucket, key in zip(self._buckets, keys):
+            for cluster in bucket.get(key, ()):
+                if cluster in seen:
+                    continue
+                seen.add(cluster)
+                if np.count_nonzero(self.signatures[cluster] == signature) >= self.threshold * self.num_perm:
+                    return cluster, False
+        
+        cluster = len(self.signatures)
+        self.signatures.append(signature)
+        for bucket, key in zip(self._buckets, keys):
+            bucket.setdefault(key, []).append(cluster)
+        return cluster, True
+    
+    def add(self, text):
+        """
+        Assign a text to a cluster, creating one if no representative is similar enough.
+        
+        Returns:
+            Tuple of (cluster id, whether a new cluster was created)
+        """
+        return self.add_signature(self.signature(text))
+    
+    def cluster(self, texts):
+        """
+        Cluster a list of texts.
+        
+        Returns:
+            Tuple of (cluster id per text, index of each cluster's representative text)
+        """
+        assignments = []
+        representatives = []
+        signatures = self.signatures_of(texts)
+        band_keys = self.band_keys(signatures).tolist()
+        for i, (signature, keys) in enumerate(zip(signatures, band_keys)):
+            cluster, created = self.add_signature(signature, keys)
+            if created:
+                representatives.append(i)
+            assignments.append(cluster)
+        return np.asarray(assignments, dtype=np.intp), representatives
+
+
+def deduplicate(texts, threshold=0.8, **index_options):
+    """
+    Cluster texts with a fresh NearDuplicateIndex and summarize the savings.
+    
+    Args:
+        texts: List of texts
+        threshold: Minimum estimated Jaccard similarity to join a cluster
+        
+    Returns:
+        Tuple of (cluster id per text, representative indices, report dict)
+    """
+    start = time.perf_counter()
+    index = NearDuplicateIndex(threshold=threshold, **index_options)
+    assignments, representatives = index.cluster(texts)
+    total = len(texts)
+    report = {
+        'threshold': threshold,
+        'emails': total,
+        'clusters': len(representatives),
+        'inference_saved': total - len(representatives),
+        'inference_saved_rate': round(1 - len(representatives) / total, 4) if total else 0.0,
+        'dedup_seconds': round(time.perf_counter() - start, 4)
+    }
+    return assignments, representatives, report
+
+
+def expand_results(results, assignments, representatives):
+    """
+    Fan per-cluster prediction dicts out to every email.
+    
+    Results of non-representative emails are copies carrying 'duplicate_of',
+    the index of their cluster's representative.
+    """
+    expanded = []
+    for i, cluster in enumerate(assignments):
+        result = results[cluster]
+        if representatives[cluster] != i:
+            result = dict(result, duplicate_of=int(representatives[cluster]))
+        expanded.append(result)
+    return expanded
+
+
+def expand_lean(result, assignments):
+    """Fan a per-cluster EmailClassifier.predict_lean result out to every email."""
+    expanded = dict(result, labels=[result['labels'][cluster] for cluster in assignments])
+    if 'probabilities' in result:
+        expanded['probabilities'] = result['probabilities'][assignments]
+    return expanded
+
+
+def classify_deduplicated(classifier, emails, threshold=0.8, **predict_options):
+    """
+    Classify one representative per near-duplicate cluster and fan the results out.
+    
+    Args:
+        classifier: EmailClassifier (or anything with predict_batch)
+        emails: List of email texts
+        threshold: Minimum estimated Jaccard similarity to join a cluster
+        **predict_options: Passed to classifier.predict_batch
+        
+    Returns:
+        Tuple of (list of prediction results, report dict)
+    """
+    assignments, representatives, report = deduplicate(emails, threshold)
+    results = classifier.predict_batch([emails[i] for i in representatives], **predict_options)
+    return expand_results(results, assignments, representatives), report
@@ -3,18 +3,78 @@ Email Classification FastAPI
 Milestone 7 - Activity 7.2: Build a FastAPI REST API for predictions
 """
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, Header, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import HTMLResponse
-from pydantic import BaseModel, Field
-from typing import List, Optional
+from fastapi.responses import HTMLResponse, Response
+from pydantic import BaseModel, Field, ValidationError
+from typing import List, Literal, Optional, Union
 import sys
 import os
+import time
+from contextlib import asynccontextmanager
 
 # Add parent directory to path for imports
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from app.predictor import EmailClassifier
+from app.registry import ModelRegistry
+from app.dedup import deduplicate, expand_results, expand_lean
+from app import memory
+from app.serialization import (
+    LeanJSONResponse, JSON_MEDIA_TYPE, MSGPACK_MEDIA_TYPE, ARROW_MEDIA_TYPE,
+    normalize_media_type, negotiate_media_type,
+    binary_available, decode_batch_request, encode_batch_response
+)
+
+# Set at startup by lifespan()
+registry = None
+classifier = None
+
+
+@asynccontextmanager
+async def lifespan(app):
+    """
+    Load the model registry at startup and stop the shadow process at shutdown.
+    
+    Building the registry here rather than at import keeps spawned shadow
+    processes, which re-import the main module when the server is started
+    with ``python fastapi_app.py``, from loading models or starting shadows.
+    """
+    global registry, classifier
+    
+    # Trace allocations from startup so snapshots include model loading
+    if os.environ.get('MEMORY_TRACEMALLOC', '0') == '1':
+        memory.start_tracing()
+    
+    # Several models from MODEL_REGISTRY_CONFIG, otherwise the single default classifier
+    cascade_threshold = float(os.environ.get('CASCADE_THRESHOLD', 0.9))
+    if os.environ.get('MODEL_REGISTRY_CONFIG'):
+        registry = ModelRegistry.from_config(os.environ['MODEL_REGISTRY_CONFIG'],
+                                             cascade_threshold=cascade_threshold)
+    else:
+        registry = ModelRegistry(cascade_threshold=cascade_threshold)
+        registry.register('email-classifier', app.version, EmailClassifier())
+    classifier = registry.models[registry.default_key]
+    
+    # Streaming traffic / drift statistics on every model (DRIFT_MONITORING=0 disables)
+    if os.environ.get('DRIFT_MONITORING', '1') != '0':
+        for model in registry.models.values():
+            model.enable_monitoring(window_seconds=int(os.environ.get('DRIFT_WINDOW_SECONDS', 300)))
+    
+    # Warn at startup if this worker exceeds its memory budget. WordNet is
+    # loaded lazily on the first lemmatize call, so load it (and wait for the
+    # shadow model) first to measure the steady-state footprint
+    if os.environ.get('WORKER_MEMORY_BUDGET_MB'):
+        memory.load_wordnet()
+        if registry.shadow is not None:
+            registry.shadow.wait_ready(timeout=120)
+        memory.check_budget(memory.registry_report(registry), float(os.environ['WORKER_MEMORY_BUDGET_MB']))
+    
+    yield
+    registry.stop_shadow()
+
 
 # Initialize FastAPI app
 app = FastAPI(
@@ -22,7 +82,8 @@ app = FastAPI(
     description="REST API for classifying emails into Important, Promotion, or Spam categories",
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    lifespan=lifespan
 )
 
 # Enable CORS
@@ -38,8 +99,11 @@ app.add_middleware(
 static_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'static')
 app.mount("/static", StaticFiles(directory=static_dir), name="static")
 
-# Initialize classifier
-classifier = EmailClassifier()
+# Header used to pin a request to a registered model
+MODEL_HEADER = "X-Model"
+
+# Maximum emails per MessagePack / Arrow batch request
+MAX_BINARY_BATCH = 10000
 
 
 # ============================================
@@ -72,6 +136,12 @@ class ConfidenceScores(BaseModel):
     General: float
 
 
+class FeatureContribution(BaseModel):
+    """Contribution of one TF-IDF n-gram to the predicted class logit."""
+    feature: str
+    contribution: float
+
+
 class PredictionResponse(BaseModel):
     """Response model for prediction."""
     success: bool
@@ -79,9 +149,18 @@ class PredictionResponse(BaseModel):
     confidence: Optional[float] = None
     confidence_scores: Optional[ConfidenceScores] = None
     preprocessed_text: Optional[str] = None
+    explanation: Optional[List[FeatureContribution]] = None
+    tier: Optional[str] = None
     error: Optional[str] = None
 
 
+class LeanPredictionResponse(BaseModel):
+    """Response model for lean-mode prediction."""
+    label: str
+    classes: List[str]
+    probabilities: Optional[List[float]] = None
+
+
 class HealthResponse(BaseModel):
     """Response model for health check."""
     status: str
@@ -89,6 +168,88 @@ class HealthResponse(BaseModel):
     model_loaded: bool
 
 
+# ============================================
+# HELPERS
+# ============================================
+
+def resolve_model(requested):
+    """Route a request to a registered model, 404 for unknown model headers."""
+    try:
+        return registry.resolve(requested)
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=e.args[0])
+
+
+def run_full(key, model, emails, explain, top_k, use_cascade):
+    """Full-mode predictions, through the cascade when requested."""
+    predictor = registry.cascade(key) if use_cascade else None
+    return (predictor or model).predict_batch(emails, explain=explain, top_k=top_k)
+
+
+def run_lean(key, model, emails, probabilities, use_cascade):
+    """Lean predictions, through the cascade when requested, raising 400 if the model could not run."""
+    predictor = registry.cascade(key) if use_cascade else None
+    result = (predictor or model).predict_lean(emails, include_probabilities=probabilities)
+    if not result['success']:
+        raise HTTPException(status_code=400, detail=result.get('error', 'Prediction failed'))
+    return result
+
+
+def classify_batch(key, model, emails, response, response_type, mode, probabilities,
+                   explain, top_k, use_cascade, dedup, dedup_threshold):
+    """Classify a decoded batch and build the response in the negotiated format."""
+    headers = {MODEL_HEADER: key}
+    
+    dedup_report = None
+    if dedup:
+        assignments, representatives, dedup_report = deduplicate(emails, dedup_threshold)
+        model_emails = [emails[i] for i in representatives]
+        headers["X-Inference-Saved"] = str(dedup_report['inference_saved'])
+    else:
+        model_emails = emails
+    
+    start = time.perf_counter()
+    
+    if response_type != JSON_MEDIA_TYPE or mode == "lean":
+        result = run_lean(key, model, model_emails, probabilities, use_cascade)
+        registry.submit_shadow(key, model_emails, result['labels'], time.perf_counter() - start,
+                               mode="lean", probabilities=probabilities, cascade=use_cascade)
+        if dedup:
+            result = expand_lean(result, assignments)
+        
+        if response_type != JSON_MEDIA_TYPE:
+            return Response(content=encode_batch_response(result, response_type),
+                            media_type=response_type, headers=headers)
+        
+        content = {
+            "count": len(result['labels']),
+            "classes": result['classes'],
+            "labels": result['labels']
+        }
+        if probabilities:
+            content["probabilities"] = result['probabilities']
+        if dedup_report is not None:
+            content["deduplication"] = dedup_report
+        return LeanJSONResponse(content=content, headers=headers)
+    
+    results = run_full(key, model, model_emails, explain, top_k, use_cascade)
+    registry.submit_shadow(key, model_emails, [r.get('predicted_category') for r in results],
+                           time.perf_counter() - start,
+                           mode="full", cascade=use_cascade, explain=explain, top_k=top_k)
+    if dedup:
+        results = expand_results(results, assignments, representatives)
+    
+    response.headers.update(headers)
+    content = {
+        "success": True,
+        "count": len(results),
+        "predictions": results
+    }
+    if dedup_report is not None:
+        content["deduplication"] = dedup_report
+    return content
+
+
 # ============================================
 # API ROUTES
 # ============================================
@@ -115,39 +276,203 @@ async def health_check():
     }
 
 
-@app.post("/api/predict", response_model=PredictionResponse)
-async def predict(request: EmailRequest):
+@app.post("/api/predict", response_model=Union[PredictionResponse, LeanPredictionResponse])
+async def predict(
+    request: EmailRequest,
+    response: Response,
+    mode: Literal["full", "lean"] = Query("full", description="Response mode"),
+    probabilities: bool = Query(True, description="Include probabilities in lean mode"),
+    explain: bool = Query(False, description="Include top contributing n-grams in full mode"),
+    top_k: int = Query(5, ge=1, le=50, description="Number of n-grams to explain"),
+    use_cascade: bool = Query(False, alias="cascade", description="Use the two-tier cascade"),
+    x_model: Optional[str] = Header(None, alias=MODEL_HEADER, description="Pin the request to a registered model")
+):
     """
     Predict the category of a single email.
     
     - **email**: The email text to classify
+    - **mode**: `full` (default) or `lean` for label and probability array only
+    - **probabilities**: Include the probability array in lean mode
+    - **explain**: Include the top-k n-grams driving the predicted class
+    - **cascade**: Answer from the cheap first stage when it is confident
+    - **X-Model** header: Serve from a registered `name` or `name:version`
     
     Returns the predicted category with confidence scores.
     """
-    result = classifier.predict(request.email)
+    if explain and mode == "lean":
+        raise HTTPException(status_code=400, detail='explain is only available in full mode')
+    
+    key, model = resolve_model(x_model)
+    start = time.perf_counter()
+    
+    if mode == "lean":
+        result = run_lean(key, model, [request.email], probabilities, use_cascade)
+        registry.submit_shadow(key, [request.email], result['labels'], time.perf_counter() - start,
+                               mode="lean", probabilities=probabilities, cascade=use_cascade)
+        if result['labels'][0] is None:
+            raise HTTPException(status_code=400, detail='Email text is empty after preprocessing.')
+        
+        content = {"label": result['labels'][0], "classes": result['classes']}
+        if probabilities:
+            content["probabilities"] = result['probabilities'][0]
+        return LeanJSONResponse(content=content, headers={MODEL_HEADER: key})
+    
+    result = run_full(key, model, [request.email], explain, top_k, use_cascade)[0]
+    registry.submit_shadow(key, [request.email], [result.get('predicted_category')],
+                           time.perf_counter() - start,
+                           mode="full", cascade=use_cascade, explain=explain, top_k=top_k)
     
     if not result['success']:
         raise HTTPException(status_code=400, detail=result.get('error', 'Prediction failed'))
     
+    response.headers[MODEL_HEADER] = key
     return result
 
 
-@app.post("/api/predict/batch")
-async def predict_batch(request: BatchEmailRequest):
+@app.post(
+    "/api/predict/batch",
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                JSON_MEDIA_TYPE: {"schema": BatchEmailRequest.model_json_schema()},
+                MSGPACK_MEDIA_TYPE: {"schema": {"type": "string", "format": "binary"}},
+                ARROW_MEDIA_TYPE: {"schema": {"type": "string", "format": "binary"}},
+            }
+        }
+    }
+)
+async def predict_batch(
+    http_request: Request,
+    response: Response,
+    mode: Literal["full", "lean"] = Query("full", description="JSON response mode"),
+    probabilities: bool = Query(True, description="Include probabilities in lean and binary responses"),
+    explain: bool = Query(False, description="Include top contributing n-grams in full mode"),
+    top_k: int = Query(5, ge=1, le=50, description="Number of n-grams to explain"),
+    use_cascade: bool = Query(False, alias="cascade", description="Use the two-tier cascade"),
+    dedup: bool = Query(False, description="Classify one email per near-duplicate cluster"),
+    dedup_threshold: float = Query(0.8, gt=0, le=1, description="Near-duplicate Jaccard similarity"),
+    x_model: Optional[str] = Header(None, alias=MODEL_HEADER, description="Pin the request to a registered model")
+):
     """
     Predict categories for multiple emails.
     
-    - **emails**: List of email texts to classify (max 100)
+    - **emails**: List of email texts to classify (max 100 for JSON)
+    - **mode**: `full` (default) or `lean` for label and probability arrays only
+    - **probabilities**: Include the probability matrix in lean and binary responses
+    - **explain**: Include the top-k n-grams driving each predicted class
+    - **cascade**: Answer from the cheap first stage when it is confident
+    - **dedup**: Cluster near-duplicates (MinHash/LSH) and classify one email per cluster
+    - **X-Model** header: Serve from a registered `name` or `name:version`
+    
+    MessagePack (`application/msgpack`) and Arrow IPC stream
+    (`application/vnd.apache.arrow.stream`) bodies are also accepted, with
+    up to 10000 emails. The response format follows the `Accept` header and
+    defaults to the request format; binary responses carry a label column
+    and a float32 probability matrix.
     
     Returns predictions for all emails.
     """
-    results = classifier.predict_batch(request.emails)
+    content_type = normalize_media_type(http_request.headers.get('content-type'))
     
-    return {
-        "success": True,
-        "count": len(results),
-        "predictions": results
-    }
+    if content_type in (MSGPACK_MEDIA_TYPE, ARROW_MEDIA_TYPE):
+        if not binary_available(content_type):
+            raise HTTPException(status_code=415, detail=f"{content_type} support is not installed")
+        try:
+            emails = decode_batch_request(await http_request.body(), content_type)
+        except Exception as e:
+            raise HTTPException(status_code=400, detail=f"Could not decode request body: {e}")
+        if not 1 <= len(emails) <= MAX_BINARY_BATCH:
+            raise HTTPException(status_code=400,
+                                detail=f"Batch must contain between 1 and {MAX_BINARY_BATCH} emails")
+        response_type = negotiate_media_type(http_request.headers.get('accept'), default=content_type)
+    elif content_type and content_type != JSON_MEDIA_TYPE and not content_type.endswith('+json'):
+        raise HTTPException(status_code=415, detail=f"Unsupported request content type: {content_type}")
+    else:
+        try:
+            request = BatchEmailRequest.model_validate(await http_request.json())
+        except ValueError as e:
+            errors = [
+                {**error, "loc": ("body", *error["loc"])} for error in e.errors()
+            ] if isinstance(e, ValidationError) else [
+                {"type": "json_invalid", "loc": ("body",), "msg": "JSON decode error"}
+            ]
+            raise RequestValidationError(errors)
+        emails = request.emails
+        response_type = negotiate_media_type(http_request.headers.get('accept'))
+    
+    if response_type is None:
+        raise HTTPException(status_code=406, detail='None of the acceptable media types are supported')
+    if response_type != JSON_MEDIA_TYPE and not binary_available(response_type):
+        raise HTTPException(status_code=406, detail=f"{response_type} support is not installed")
+    if explain and (response_type != JSON_MEDIA_TYPE or mode == "lean"):
+        raise HTTPException(status_code=400,
+                            detail='explain is only available for full-mode JSON responses')
+    
+    key, model = resolve_model(x_model)
+    
+    # Inference on up to MAX_BINARY_BATCH emails would stall the event loop
+    return await run_in_threadpool(
+        classify_batch, key, model, emails, response, response_type, mode, probabilities,
+        explain, top_k, use_cascade, dedup, dedup_threshold
+    )
+
+
+@app.get("/api/cascade/stats")
+async def cascade_stats(
+    model: Optional[str] = Query(None, description="Registered model (default model if omitted)")
+):
+    """Per-tier hit rates of the cascade since startup."""
+    key = resolve_model(model)[0] if model else registry.default_key
+    cascade = registry.cascade(key)
+    if cascade is None:
+        raise HTTPException(status_code=503, detail='Model not loaded. Please check model files.')
+    return {"success": True, "model": key, **cascade.get_stats()}
+
+
+@app.get("/api/monitoring")
+async def monitoring_snapshot(
+    model: Optional[str] = Query(None, description="Registered model (default model if omitted)"),
+    top_k: int = Query(20, ge=1, le=50, description="Number of unseen tokens to list")
+):
+    """
+    Windowed traffic and drift statistics.
+    
+    Returns the predicted-category distribution and its shift from the
+    training distribution, confidence histogram and quantiles, the
+    out-of-vocabulary token rate and the most frequent unseen tokens for
+    the current window, recent windows and since startup.
+    """
+    key, monitored = resolve_model(model) if model else (registry.default_key, classifier)
+    if monitored.monitor is None:
+        raise HTTPException(status_code=503, detail='Monitoring is disabled or the model is not loaded.')
+    return {"success": True, "model": key, **monitored.monitor.snapshot(top_k=top_k)}
+
+
+@app.get("/api/memory")
+def memory_report(
+    tracemalloc_top: int = Query(0, ge=0, le=100, description="Top allocation sites (needs MEMORY_TRACEMALLOC=1)")
+):
+    """
+    Memory footprint of this worker.
+    
+    Reports the estimated size of each loaded component (vocabulary,
+    coefficients, stopwords, WordNet, caches) per model, the process RSS,
+    the RSS not covered by the estimates and, when tracemalloc is enabled,
+    the largest allocation sites.
+    """
+    report = memory.registry_report(registry)
+    if tracemalloc_top:
+        report['top_allocations'] = memory.top_allocations(tracemalloc_top)
+    budget = os.environ.get('WORKER_MEMORY_BUDGET_MB')
+    report['budget_mb'] = float(budget) if budget else None
+    return {"success": True, **report}
+
+
+@app.get("/api/models")
+async def list_models():
+    """Registered models, traffic split and shadow evaluation statistics."""
+    return {"success": True, **registry.describe()}
 
 
 @app.get("/api/categories")
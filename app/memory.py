@@ -0,0 +1,241 @@
+"""
+Memory Footprint Accounting
+Per-component size estimates, tracemalloc snapshots and a per-worker budget check
+"""
+
+import sys
+import tracemalloc
+import types
+
+import numpy as np
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - not available on Windows
+    resource = None
+
+try:
+    import scipy.sparse as sp
+except ImportError:  # pragma: no cover - scipy comes with scikit-learn
+    sp = None
+
+
+def deep_sizeof(obj, seen=None):
+    """
+    Approximate recursive size of an object in bytes.
+    
+    Follows containers, instance __dict__/__slots__ and counts numpy and
+    scipy sparse buffers by nbytes. Objects reachable several times are
+    counted once; modules are shared interpreter state and are not followed.
+    """
+    if seen is None:
+        seen = set()
+    if id(obj) in seen or isinstance(obj, types.ModuleType):
+        return 0
+    seen.add(id(obj))
+    
+    if isinstance(obj, np.ndarray):
+        # Views report only their header in getsizeof, so add the buffer explicitly
+        return sys.getsizeof(obj) + (obj.nbytes if obj.base is not None else 0)
+    if sp is not None and sp.issparse(obj):
+        return sum(deep_sizeof(getattr(obj, name), seen)
+                   for name in ('data', 'indices', 'indptr') if hasattr(obj, name))
+    
+    size = sys.getsizeof(obj)
+    if isinstance(obj, (str, bytes, int, float, bool, type(None))):
+        return size
+    if isinstance(obj, dict):
+        size += sum(deep_sizeof(k, seen) + deep_sizeof(v, seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(deep_sizeof(item, seen) for item in obj)
+    
+    if hasattr(obj, '__dict__') and not isinstance(obj, type):
+        size += deep_sizeof(vars(obj), seen)
+    for name in getattr(type(obj), '__slots__', ()):
+        if hasattr(obj, name):
+            size += deep_sizeof(getattr(obj, name), seen)
+    return size
+
+
+def process_rss_bytes(pid=None):
+    """
+    Current resident set size of a process (this one by default).
+    
+    Falls back to this process's peak RSS if /proc is unavailable; other
+    processes are then reported as None.
+    """
+    try:
+        with open(f"/proc/{pid or 'self'}/status", 'r') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    if resource is not None and pid is None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is in bytes on macOS and kilobytes elsewhere
+        return peak if sys.platform == 'darwin' else peak * 1024
+    return None
+
+
+def load_wordnet():
+    """
+    Load the lemmatizer's WordNet corpus now rather than on the first lemmatize call.
+    
+    Returns:
+        bool: True if WordNet is loaded
+    """
+    try:
+        from nltk.stem import WordNetLemmatizer
+        # The same call that loads the corpus on the first request
+        WordNetLemmatizer().lemmatize('emails')
+        return True
+    except Exception as e:
+        print(f"⚠️ WordNet could not be loaded: {e}")
+        return False
+
+
+# Size of the loaded WordNet corpus, computed once: lemmatizing only reads
+# its lemma and exception maps, and walking them takes seconds
+_wordnet_bytes = None
+
+
+def wordnet_bytes():
+    """Size of the loaded WordNet corpus used by the lemmatizer (0 if not loaded yet)."""
+    global _wordnet_bytes
+    if _wordnet_bytes is not None:
+        return _wordnet_bytes
+    try:
+        from nltk.corpus import wordnet
+    except ImportError:
+        return 0
+    # LazyCorpusLoader replaces its own class with the reader on first use
+    if type(wordnet).__name__ == 'LazyCorpusLoader':
+        return 0
+    _wordnet_bytes = deep_sizeof(wordnet)
+    return _wordnet_bytes
+
+
+def classifier_components(classifier, seen=None):
+    """
+    Estimated size of each component held by an EmailClassifier.
+    
+    Objects shared between components (e.g. the vocabulary referenced by the
+    monitor) are attributed to the first component that reaches them.
+    
+    Returns:
+        dict: Component name -> bytes
+    """
+    if seen is None:
+        seen = set()
+    components = {}
+    vectorizer = classifier.vectorizer
+    model = classifier.model
+    if vectorizer is not None:
+        components['vocabulary'] = deep_sizeof(vectorizer.vocabulary_, seen)
+        components['idf'] = deep_sizeof(getattr(vectorizer, 'idf_', None), seen)
+        components['vectorizer_other'] = deep_sizeof(vectorizer, seen)
+    if model is not None:
+        components['coefficients'] = deep_sizeof(model.coef_, seen) + deep_sizeof(model.intercept_, seen)
+    if classifier.feature_names is not None:
+        components['feature_names'] = deep_sizeof(classifier.feature_names, seen)
+    components['stopwords'] = deep_sizeof(classifier.stop_words, seen)
+    if classifier.monitor is not None:
+        components['monitor'] = deep_sizeof(classifier.monitor, seen)
+    return components
+
+
+def registry_report(registry):
+    """
+    Memory report for every model of a ModelRegistry plus shared data.
+    
+    WordNet is loaded once per process and shared by every lemmatizer, so
+    it is reported separately. A shadow model runs in its own process and
+    is reported by that process's RSS.
+    
+    Returns:
+        dict: Per-model components, shared components, totals, process RSS,
+        the RSS not covered by the estimate and shadow process RSS
+    """
+    cascades = registry.built_cascades()
+    models = {}
+    for key, classifier in registry.models.items():
+        # The cascade references its classifier, which is already accounted for
+        seen = {id(classifier)}
+        components = classifier_components(classifier, seen)
+        if key in cascades:
+            components['cascade'] = deep_sizeof(cascades[key], seen)
+        models[key] = {'components': components, 'total_bytes': sum(components.values())}
+    
+    shared = {'wordnet': wordnet_bytes()}
+    
+    estimated = sum(m['total_bytes'] for m in models.values()) + sum(shared.values())
+    rss = process_rss_bytes()
+    shadow = None
+    if registry.shadow is not None:
+        shadow = {'model': registry.shadow.key, 'rss_bytes': process_rss_bytes(registry.shadow.pid)}
+    return {
+        'models': models,
+        'shared': shared,
+        'estimated_bytes': estimated,
+        'rss_bytes': rss,
+        # Interpreter, libraries, allocator overhead and anything deep_sizeof misses
+        'unattributed_bytes': rss - estimated if rss is not None else None,
+        'shadow': shadow
+    }
+
+
+def start_tracing(frames=1):
+    """Start tracemalloc (no-op if already tracing)."""
+    if not tracemalloc.is_tracing():
+        tracemalloc.start(frames)
+
+
+def top_allocations(limit=10):
+    """
+    Largest allocation sites since tracing started.
+    
+    Returns:
+        list of dicts with 'site', 'size_bytes' and 'count', or None if tracemalloc is off
+    """
+    if not tracemalloc.is_tracing():
+        return None
+    snapshot = tracemalloc.take_snapshot().filter_traces([
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+    ])
+    return [
+        {'site': str(stat.traceback[0]), 'size_bytes': stat.size, 'count': stat.count}
+        for stat in snapshot.statistics('lineno')[:limit]
+    ]
+
+
+def check_budget(report, budget_mb):
+    """
+    Warn when the per-worker footprint exceeds the budget.
+    
+    Uses the measured RSS when available, otherwise the component estimate,
+    plus the RSS of the worker's shadow process if it has one. The reported
+    largest contributor is chosen among the model and shared components,
+    the unattributed RSS and the shadow process.
+    
+    Returns:
+        bool: True if the footprint is within budget
+    """
+    footprint = report['rss_bytes'] or report['estimated_bytes']
+    if report.get('shadow') and report['shadow']['rss_bytes']:
+        footprint += report['shadow']['rss_bytes']
+    footprint_mb = footprint / (1024 * 1024)
+    if footprint_mb > budget_mb:
+        sizes = [(f"{key}/{name}", size) for key, m in report['models'].items()
+                 for name, size in m['components'].items()]
+        sizes += [(f"shared/{name}", size) for name, size in report['shared'].items()]
+        if report.get('unattributed_bytes'):
+            sizes.append(('unattributed', report['unattributed_bytes']))
+        if report.get('shadow') and report['shadow']['rss_bytes']:
+            sizes.append(('shadow/rss', report['shadow']['rss_bytes']))
+        largest = max(sizes, key=lambda item: item[1], default=(None, 0))
+        print(f"⚠️ Worker memory {footprint_mb:.1f} MB exceeds budget of {budget_mb:.1f} MB "
+              f"(largest contributor: {largest[0]}, {largest[1] / (1024 * 1024):.1f} MB)")
+        return False
+    return True
@@ -0,0 +1,378 @@
+"""
+Streaming Traffic and Drift Monitoring
+Fixed-memory sketches updated in-process on every prediction
+"""
+
+import heapq
+import random
+import threading
+import time
+from collections import Counter, deque
+from itertools import filterfalse
+
+import numpy as np
+
+# Category distribution of the training set (see README, Model Performance)
+TRAINING_DISTRIBUTION = {
+    'Urgent': 0.1436,
+    'Financial': 0.2613,
+    'HR': 0.1613,
+    'General': 0.4338,
+}
+
+
+class CountMinSketch:
+    """
+    Count-min sketch: approximate counts in depth x width integers.
+    
+    Keys are hashed once with Python's (per-process, cached) string hash
+    and spread over the rows with multiply-shift hashing, so a batch of
+    keys is hashed and counted in a few array operations. The sketch never
+    leaves the process, so hash randomization does not matter. Sketches with the same width, depth and seed
+    share their column layout, so columns computed once can update several
+    of them.
+    """
+    
+    def __init__(self, width=2048, depth=4, seed=0):
+        if width & (width - 1):
+            raise ValueError("width must be a power of two")
+        self.width = width
+        self.depth = depth
+        self._shift = np.uint64(64 - (width.bit_length() - 1))
+        self.table = np.zeros((depth, width), dtype=np.int64)
+        self._flat = self.table.ravel()
+        rng = np.random.RandomState(seed)
+        self._a = rng.randint(0, 1 << 63, size=depth, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+        self._b = rng.randint(0, 1 << 63, size=depth, dtype=np.uint64)
+        self._row_offsets = np.arange(depth) * width
+    
+    def columns(self, keys):
+        """
+        Position of every key in every row, as flat indices into the table.
+        
+        Returns:
+            ndarray of shape (len(keys), depth)
+        """
+        hashes = np.fromiter(map(hash, keys), dtype=np.int64, count=len(keys)).view(np.uint64)
+        # uint64 overflow wraps, which is the intended mod 2**64
+        with np.errstate(over='ignore'):
+            mixed = np.multiply.outer(hashes, self._a) + self._b
+        return (mixed >> self._shift).astype(np.intp) + self._row_offsets
+    
+    def add_columns(self, columns, counts):
+        """
+        Add counts to keys given by their columns.
+        
+        Returns:
+            ndarray: New estimate of every key
+        """
+        if columns.size > self._flat.size:
+            # Large batches: one dense pass beats np.add.at's unbuffered scatter
+            self._flat += np.bincount(columns.ravel(), weights=np.repeat(counts, self.depth),
+                                      minlength=self._flat.size).astype(np.int64)
+        else:
+            np.add.at(self._flat, columns.ravel(), np.repeat(counts, self.depth))
+        return self.estimate_columns(columns)
+    
+    def estimate_columns(self, columns):
+        """Estimates of keys given by their columns."""
+        return self._flat[columns].min(axis=1)
+    
+    def add(self, key, count=1):
+        """Add count to key and return its new estimate."""
+        return int(self.add_columns(self.columns([key]), np.array([count]))[0])
+    
+    def estimate(self, key):
+        """Upper-bound estimate of key's count."""
+        return int(self._flat[self.columns([key])[0]].min())
+
+
+class HeavyHitters:
+    """
+    Top-k frequent keys from a count-min sketch plus a bounded candidate set.
+    
+    Memory is fixed: the sketch has depth x width counters and at most
+    capacity candidate keys are tracked. Candidates sit in a min-heap with
+    lazy deletion, so replacing the weakest one is O(log capacity).
+    """
+    
+    def __init__(self, capacity=50, width=2048, depth=4):
+        self.capacity = capacity
+        self.sketch = CountMinSketch(width, depth)
+        self.candidates = {}
+        self._heap = []
+    
+    def _offer(self, key, estimate):
+        """Track key if it is a candidate or beats the weakest one."""
+        if key not in self.candidates:
+            if len(self.candidates) >= self.capacity:
+                # Drop heap entries left behind by later updates
+                while self.candidates.get(self._heap[0][1]) != self._heap[0][0]:
+                    heapq.heappop(self._heap)
+                if estimate <= self._heap[0][0]:
+                    return
+                del self.candidates[heapq.heappop(self._heap)[1]]
+        self.candidates[key] = estimate
+        heapq.heappush(self._heap, (estimate, key))
+        if len(self._heap) > 4 * self.capacity:
+            self._heap = [(value, k) for k, value in self.candidates.items()]
+            heapq.heapify(self._heap)
+    
+    def add_many(self, keys, counts, columns=None):
+        """
+        Count a batch of distinct keys.
+        
+        Args:
+            keys: Distinct keys
+            counts: ndarray of occurrences of each key
+            columns: Precomputed sketch columns of the keys (optional)
+        """
+        if columns is None:
+            columns = self.sketch.columns(keys)
+        estimates = self.sketch.add_columns(columns, counts)
+        if len(self.candidates) >= self.capacity:
+            # Only keys above the weakest candidate's count can enter; every
+            # tracked key just grew past it, so it is kept as well
+            floor = min(self.candidates.values())
+            selected = np.flatnonzero(estimates > floor)
+        else:
+            selected = np.arange(len(keys))
+        if len(selected) > self.capacity:
+            # Only the batch's top keys can end up tracked; candidates that
+            # were cut from it still get their new estimates
+            selected = selected[np.argpartition(estimates[selected], -self.capacity)[-self.capacity:]]
+            tracked = list(self.candidates)
+            for key, estimate in zip(tracked, self.sketch.estimate_columns(self.sketch.columns(tracked))):
+                self.candidates[key] = int(estimate)
+            self._heap = [(value, k) for k, value in self.candidates.items()]
+            heapq.heapify(self._heap)
+        for i in selected:
+            self._offer(keys[i], int(estimates[i]))
+    
+    def add(self, key):
+        self.add_many([key], np.array([1]))
+    
+    def top(self, k=20):
+        """Most frequent keys as (key, estimated count), largest first."""
+        return sorted(self.candidates.items(), key=lambda item: -item[1])[:k]
+
+
+class Reservoir:
+    """Uniform random sample of a stream (Algorithm R) in fixed memory."""
+    
+    def __init__(self, size=1000, seed=None):
+        self.size = size
+        self.seen = 0
+        self.samples = []
+        self._rng = random.Random(seed)
+    
+    def add(self, value):
+        self.seen += 1
+        if len(self.samples) < self.size:
+            self.samples.append(value)
+        else:
+            index = self._rng.randrange(self.seen)
+            if index < self.size:
+                self.samples[index] = value
+    
+    def add_many(self, values):
+        for value in values:
+            self.add(value)
+
+
+class WindowStats:
+    """Sketches for one window of traffic."""
+    
+    def __init__(self, categories, bins, top_k_capacity, reservoir_size):
+        self.started = time.time()
+        self.requests = 0
+        self.failures = 0
+        self.category_counts = dict.fromkeys(categories, 0)
+        self.confidence_histogram = np.zeros(len(bins) - 1, dtype=np.int64)
+        self.confidence_sample = Reservoir(reservoir_size)
+        self.tokens = 0
+        self.oov_tokens = 0
+        self.unseen = HeavyHitters(capacity=top_k_capacity)
+    
+    def snapshot(self, bins, reference, top_k):
+        """JSON-friendly summary of the window."""
+        total = sum(self.category_counts.values())
+        distribution = {
+            category: round(count / total, 4) if total else 0.0
+            for category, count in self.category_counts.items()
+        }
+        sample = np.asarray(self.confidence_sample.samples)
+        return {
+            'started': self.started,
+            'duration_seconds': round(time.time() - self.started, 3),
+            'requests': self.requests,
+            'failures': self.failures,
+            'category_counts': dict(self.category_counts),
+            'category_distribution': distribution,
+            'distribution_shift': _total_variation(distribution, reference) if total else None,
+            'confidence_histogram': {
+                'bins': [round(float(b), 2) for b in bins],
+                'counts': self.confidence_histogram.tolist()
+            },
+            'confidence_quantiles': {
+                f"p{q}": round(float(np.percentile(sample, q)), 4) for q in (5, 25, 50, 75, 95)
+            } if len(sample) else None,
+            'tokens': self.tokens,
+            'oov_rate': round(self.oov_tokens / self.tokens, 4) if self.tokens else None,
+            'top_unseen_tokens': [
+                {'token': token, 'count': count} for token, count in self.unseen.top(top_k)
+            ]
+        }
+
+
+def _total_variation(distribution, reference):
+    """Total variation distance between two category distributions (0 = identical, 1 = disjoint)."""
+    categories = set(distribution) | set(reference)
+    return round(0.5 * sum(abs(distribution.get(c, 0.0) - reference.get(c, 0.0)) for c in categories), 4)
+
+
+class TrafficMonitor:
+    """
+    In-process streaming statistics of prediction traffic.
+    
+    Tracks the predicted-category distribution (and its shift from the
+    training distribution), a confidence histogram with a reservoir sample
+    for quantiles, the out-of-vocabulary token rate against the
+    vectorizer's vocabulary_ and a heavy-hitter sketch of unseen tokens.
+    Stats are kept in tumbling windows; the last few completed windows and
+    a cumulative view are kept for snapshots. All memory is fixed.
+    """
+    
+    def __init__(self, vocabulary, categories, window_seconds=300, history=12,
+                 top_k_capacity=50, reservoir_size=1000, reference=None):
+        """
+        Args:
+            vocabulary: Vectorizer vocabulary_ (only membership is used)
+            categories: Category labels in model order
+            window_seconds: Length of each tumbling window
+            history: Number of completed windows to keep
+            top_k_capacity: Candidate keys tracked by the heavy-hitter sketch
+            reservoir_size: Confidence values sampled per window
+            reference: Expected category distribution (defaults to TRAINING_DISTRIBUTION)
+        """
+        self.vocabulary = vocabulary
+        self.categories = list(categories)
+        self.window_seconds = window_seconds
+        self.reference = reference or TRAINING_DISTRIBUTION
+        self.bins = np.linspace(0.0, 1.0, 11)
+        self._options = (self.categories, self.bins, top_k_capacity, reservoir_size)
+        self._lock = threading.Lock()
+        self._history = deque(maxlen=history)
+        self._window = WindowStats(*self._options)
+        self._total = WindowStats(*self._options)
+    
+    def _roll(self):
+        """Close the current window if it has expired. Caller holds the lock."""
+        if time.time() - self._window.started >= self.window_seconds:
+            self._history.append(self._window.snapshot(self.bins, self.reference, 20))
+            self._window = WindowStats(*self._options)
+    
+    def record(self, cleaned_text, category, confidence):
+        """
+        Record one prediction.
+        
+        Args:
+            cleaned_text: Preprocessed text that was vectorized
+            category: Predicted category (None if the prediction failed)
+            confidence: Probability of the predicted category in [0, 1]
+        """
+        tokens = cleaned_text.split() if cleaned_text else []
+        unseen = Counter(filterfalse(self.vocabulary.__contains__, tokens))
+        bin_index = min(int(confidence * 10), 9) if category is not None else None
+        # Distinct unseen tokens are hashed once, outside the lock, for both sketches
+        if unseen and category is not None:
+            unseen_keys = list(unseen)
+            unseen_counts = np.fromiter(unseen.values(), dtype=np.int64, count=len(unseen))
+            unseen_columns = self._window.unseen.sketch.columns(unseen_keys)
+        n_unseen = sum(unseen.values())
+        
+        with self._lock:
+            self._roll()
+            for stats in (self._window, self._total):
+                stats.requests += 1
+                if category is None:
+                    stats.failures += 1
+                    continue
+                stats.category_counts[category] = stats.category_counts.get(category, 0) + 1
+                stats.confidence_histogram[bin_index] += 1
+                stats.confidence_sample.add(confidence)
+                stats.tokens += len(tokens)
+                stats.oov_tokens += n_unseen
+                if unseen:
+                    stats.unseen.add_many(unseen_keys, unseen_counts, unseen_columns)
+    
+    def record_many(self, cleaned_texts, categories, confidences, chunk_size=32):
+        """
+        Record a batch of predictions.
+        
+        Same statistics as calling record() per email, but categories and
+        the confidence histogram are counted in array operations, unseen
+        tokens are counted and hashed per chunk of emails and the lock is
+        taken once. Chunks keep the Counters cache-sized: on OOV-heavy
+        traffic, where most unseen tokens are distinct, one batch-wide
+        Counter is slower than per-email ones.
+        
+        Args:
+            cleaned_texts: Preprocessed texts that were vectorized (None, or
+                None entries, when no tokens should be counted)
+            categories: Predicted categories (None for failed predictions)
+            confidences: Probabilities of the predicted categories in [0, 1]
+            chunk_size: Emails per unseen-token Counter and sketch update
+        """
+        categories = list(categories)
+        succeeded = [i for i, category in enumerate(categories) if category is not None]
+        confidences = np.asarray(confidences, dtype=np.float64)[succeeded]
+        category_counts = Counter(categories[i] for i in succeeded)
+        # Same bins as record(): min(int(confidence * 10), 9)
+        histogram = np.bincount(np.minimum((confidences * 10).astype(np.int64), 9),
+                                minlength=len(self.bins) - 1)
+        
+        texts = [cleaned_texts[i] for i in succeeded] if cleaned_texts is not None else []
+        n_tokens = n_unseen = 0
+        unseen_chunks = []
+        for start in range(0, len(texts), chunk_size):
+            tokens = ' '.join(filter(None, texts[start:start + chunk_size])).split()
+            unseen = Counter(filterfalse(self.vocabulary.__contains__, tokens))
+            n_tokens += len(tokens)
+            if unseen:
+                keys = list(unseen)
+                counts = np.fromiter(unseen.values(), dtype=np.int64, count=len(keys))
+                n_unseen += int(counts.sum())
+                unseen_chunks.append((keys, counts, self._window.unseen.sketch.columns(keys)))
+        sample = confidences.tolist()
+        
+        with self._lock:
+            self._roll()
+            for stats in (self._window, self._total):
+                stats.requests += len(categories)
+                stats.failures += len(categories) - len(succeeded)
+                for category, count in category_counts.items():
+                    stats.category_counts[category] = stats.category_counts.get(category, 0) + count
+                stats.confidence_histogram += histogram
+                stats.confidence_sample.add_many(sample)
+                stats.tokens += n_tokens
+                stats.oov_tokens += n_unseen
+                for keys, counts, columns in unseen_chunks:
+                    stats.unseen.add_many(keys, counts, columns)
+    
+    def snapshot(self, top_k=20):
+        """
+        Windowed snapshot of the monitored traffic.
+        
+        Returns:
+            dict: Current window, completed windows (oldest first) and cumulative stats
+        """
+        with self._lock:
+            self._roll()
+            return {
+                'window_seconds': self.window_seconds,
+                'reference_distribution': self.reference,
+                'current': self._window.snapshot(self.bins, self.reference, top_k),
+                'windows': list(self._history),
+                'cumulative': self._total.snapshot(self.bins, self.reference, top_k)
+            }
@@ -6,6 +6,7 @@ Milestone 7 - Activity 7.1: Robust Prediction Function
 import pickle
 import re
 import os
+import numpy as np
 import nltk
 from nltk.corpus import stopwords
 from nltk.stem import WordNetLemmatizer
@@ -35,14 +36,18 @@ class EmailClassifier:
         base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
         
         if model_path is None:
-            model_path = os.path.join(base_dir, 'models', 'email_classifier_model.pkl')
+            model_path = os.environ.get(
+                'MODEL_PATH', os.path.join(base_dir, 'models', 'email_classifier_model.pkl'))
         if vectorizer_path is None:
-            vectorizer_path = os.path.join(base_dir, 'models', 'tfidf_vectorizer.pkl')
+            vectorizer_path = os.environ.get(
+                'VECTORIZER_PATH', os.path.join(base_dir, 'models', 'tfidf_vectorizer.pkl'))
         
         self.model_path = model_path
         self.vectorizer_path = vectorizer_path
         self.model = None
         self.vectorizer = None
+        self.feature_names = None
+        self.monitor = None
         self.lemmatizer = WordNetLemmatizer()
         self.stop_words = set(stopwords.words('english'))
         
@@ -59,6 +64,9 @@ class EmailClassifier:
                 self.model = pickle.load(f)
             with open(self.vectorizer_path, 'rb') as f:
                 self.vectorizer = pickle.load(f)
+            self._restore_precision()
+            # Column index -> n-gram lookup used by explain
+            self.feature_names = self.vectorizer.get_feature_names_out()
             print("✅ Model and vectorizer loaded successfully!")
             return True
         except FileNotFoundError as e:
@@ -68,6 +76,31 @@ class EmailClassifier:
             print(f"❌ Unexpected error: {e}")
             return False
     
+    def enable_monitoring(self, **options):
+        """
+        Start in-process streaming traffic and drift statistics.
+        
+        Args:
+            **options: Passed to monitoring.TrafficMonitor (window_seconds, history, ...)
+            
+        Returns:
+            TrafficMonitor: The monitor, also available as self.monitor
+        """
+        from .monitoring import TrafficMonitor
+        
+        if self.model is None or self.vectorizer is None:
+            return None
+        self.monitor = TrafficMonitor(self.vectorizer.vocabulary_, self.model.classes_, **options)
+        return self.monitor
+    
+    def _restore_precision(self):
+        """Upcast float16 parameters of compressed artifacts to float32 for inference."""
+        if self.model.coef_.dtype == np.float16:
+            self.model.coef_ = self.model.coef_.astype(np.float32)
+            self.model.intercept_ = self.model.intercept_.astype(np.float32)
+        if getattr(self.vectorizer, 'use_idf', False) and self.vectorizer.idf_.dtype == np.float16:
+            self.vectorizer.idf_ = self.vectorizer.idf_.astype(np.float32)
+    
     def preprocess_text(self, text):
         """
         Preprocess email text for classification.
@@ -103,12 +136,48 @@ class EmailClassifier:
         
         return ' '.join(words)
     
-    def predict(self, email_text):
+    def explain_vector(self, text_vectorized, class_index, top_k=5):
+        """
+        Top contributing n-grams of a vectorized email for one class.
+        
+        The model is linear over TF-IDF features, so each feature contributes
+        tfidf * coef_ to the class logit. Only the non-zero entries of the
+        sparse row are touched, making this O(nnz).
+        
+        Args:
+            text_vectorized: Sparse TF-IDF row (1 x n_features)
+            class_index: Row of coef_ to attribute against
+            top_k: Maximum number of n-grams to return
+            
+        Returns:
+            List of dicts with 'feature' and 'contribution', largest first.
+            Only features pushing towards the class are included.
+        """
+        row = text_vectorized.tocsr()
+        if row.nnz == 0 or top_k <= 0:
+            return []
+        
+        contributions = row.data * self.model.coef_[class_index, row.indices]
+        k = min(top_k, len(contributions))
+        top = np.argpartition(-contributions, k - 1)[:k]
+        top = top[np.argsort(-contributions[top])]
+        
+        return [
+            {
+                'feature': str(self.feature_names[row.indices[i]]),
+                'contribution': round(float(contributions[i]), 4)
+            }
+            for i in top if contributions[i] > 0
+        ]
+    
+    def predict(self, email_text, explain=False, top_k=5):
         """
         Predict the category of an email.
         
         Args:
             email_text: The email content to classify
+            explain: Include the top contributing n-grams for the predicted class
+            top_k: Number of n-grams to return when explain is set
             
         Returns:
             dict: Contains predicted category, confidence scores, and probabilities
@@ -124,6 +193,8 @@ class EmailClassifier:
             cleaned_text = self.preprocess_text(email_text)
             
             if not cleaned_text:
+                if self.monitor is not None:
+                    self.monitor.record(cleaned_text, None, 0.0)
                 return {
                     'success': False,
                     'error': 'Email text is empty after preprocessing.'
@@ -139,14 +210,17 @@ class EmailClassifier:
             # Create confidence scores dictionary using model's actual class order
             model_classes = self.model.classes_
             confidence_scores = {
-                cat: round(prob * 100, 2) 
+                cat: round(float(prob) * 100, 2) 
                 for cat, prob in zip(model_classes, probabilities)
             }
             
             # Get the maximum confidence
-            max_confidence = max(probabilities) * 100
+            max_confidence = float(max(probabilities)) * 100
             
-            return {
+            if self.monitor is not None:
+                self.monitor.record(cleaned_text, prediction, max_confidence / 100)
+            
+            result = {
                 'success': True,
                 'predicted_category': prediction,
                 'confidence': round(max_confidence, 2),
@@ -154,23 +228,90 @@ class EmailClassifier:
                 'preprocessed_text': cleaned_text[:200] + '...' if len(cleaned_text) > 200 else cleaned_text
             }
             
+            if explain:
+                class_index = int(np.flatnonzero(model_classes == prediction)[0])
+                result['explanation'] = self.explain_vector(text_vectorized, class_index, top_k)
+            
+            return result
+            
         except Exception as e:
             return {
                 'success': False,
                 'error': str(e)
             }
     
-    def predict_batch(self, emails):
+    def predict_batch(self, emails, explain=False, top_k=5):
         """
         Predict categories for multiple emails.
         
         Args:
             emails: List of email texts
+            explain: Include the top contributing n-grams for each email
+            top_k: Number of n-grams to return when explain is set
             
         Returns:
             List of prediction results
         """
-        return [self.predict(email) for email in emails]
+        return [self.predict(email, explain=explain, top_k=top_k) for email in emails]
+    
+    def predict_lean(self, emails, include_probabilities=True):
+        """
+        Predict categories for multiple emails in lean (array) form.
+        
+        All emails are vectorized in a single transform call and the label
+        is taken from the argmax of predict_proba, so no per-item dicts are
+        built and preprocessed text is not echoed back.
+        
+        Args:
+            emails: List of email texts
+            include_probabilities: Whether to return the probability matrix
+            
+        Returns:
+            dict: Contains the class order, one label per email (None when the
+            email is empty after preprocessing) and, optionally, one row of
+            probabilities per email in the same class order
+        """
+        if self.model is None or self.vectorizer is None:
+            return {
+                'success': False,
+                'error': 'Model not loaded. Please check model files.'
+            }
+        
+        try:
+            classes = [str(c) for c in self.model.classes_]
+            cleaned = [self.preprocess_text(email) for email in emails]
+            valid = [i for i, text in enumerate(cleaned) if text]
+            
+            labels = [None] * len(cleaned)
+            probabilities = np.full((len(cleaned), len(classes)), np.nan)
+            
+            if valid:
+                text_vectorized = self.vectorizer.transform([cleaned[i] for i in valid])
+                proba = self.model.predict_proba(text_vectorized)
+                for i, k in zip(valid, proba.argmax(axis=1)):
+                    labels[i] = classes[k]
+                probabilities[valid] = proba
+            
+            if self.monitor is not None:
+                confidences = np.zeros(len(cleaned))
+                if valid:
+                    confidences[valid] = proba.max(axis=1)
+                self.monitor.record_many(cleaned, labels, confidences)
+            
+            result = {
+                'success': True,
+                'classes': classes,
+                'labels': labels
+            }
+            if include_probabilities:
+                result['probabilities'] = probabilities.round(4)
+            return result
+            
+        except Exception as e:
+            return {
+                'success': False,
+                'error': str(e)
+            }
 
 
 # Quick test function
@@ -0,0 +1,450 @@
+"""
+Multi-Model Registry
+Named, versioned classifiers with header / percentage routing and shadow evaluation
+
+Config file format (MODEL_REGISTRY_CONFIG):
+    {
+        "default": "email-classifier:1.0.0",
+        "shadow": "email-classifier:1.1.0",
+        "shadow_queue_size": 1000,
+        "shadow_sample_rate": 0.1,
+        "models": [
+            {"name": "email-classifier", "version": "1.0.0", "weight": 90,
+             "model_path": "models/email_classifier_model.pkl",
+             "vectorizer_path": "models/tfidf_vectorizer.pkl"},
+            {"name": "email-classifier", "version": "1.1.0", "weight": 10,
+             "model_path": "models/compressed/email_classifier_model.pkl",
+             "vectorizer_path": "models/compressed/tfidf_vectorizer.pkl"}
+        ]
+    }
+"""
+
+import json
+import multiprocessing
+import os
+import queue
+import random
+import signal
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+from .predictor import EmailClassifier
+from .cascade import CascadeClassifier
+
+
+def model_key(name, version):
+    """Registry key of a named, versioned model."""
+    return f"{name}:{version}"
+
+
+def _shadow_worker(model_path, vectorizer_path, cascade_threshold, requests, results):
+    """
+    Shadow process: load the candidate model and classify queued batches.
+    
+    Each batch runs through the same path and options as the primary
+    request (full or lean, cascade, explain), so the two latencies compare
+    like-for-like. Sends one (compared, agreed, primary, shadow) tuple per
+    batch, None for failures, plus 'ready' once the model is loaded and a
+    final 'stopped' marker.
+    """
+    # Ctrl+C reaches the whole process group; the server stops us through the queue
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    classifier = EmailClassifier(model_path=model_path, vectorizer_path=vectorizer_path)
+    cascade = None
+    results.put('ready')
+    while True:
+        item = requests.get()
+        if item is None:
+            break
+        emails, primary_labels, primary_seconds, options = item
+        try:
+            predictor = classifier
+            if options.get('cascade'):
+                if cascade is None:
+                    cascade = CascadeClassifier(classifier, threshold=cascade_threshold)
+                predictor = cascade
+            
+            start = time.perf_counter()
+            if options.get('mode') == 'lean':
+                result = predictor.predict_lean(emails, include_probabilities=options.get('probabilities', True))
+                if not result['success']:
+                    raise RuntimeError(result.get('error'))
+                labels = result['labels']
+            else:
+                predictions = predictor.predict_batch(emails, explain=options.get('explain', False),
+                                                      top_k=options.get('top_k', 5))
+                labels = [r.get('predicted_category') for r in predictions]
+            seconds = time.perf_counter() - start
+            
+            compared = [(p, s) for p, s in zip(primary_labels, labels) if p is not None]
+            results.put((len(compared), sum(p == s for p, s in compared),
+                         primary_seconds / len(emails), seconds / len(emails)))
+        except Exception:
+            results.put(None)
+    results.put('stopped')
+
+
+class ShadowEvaluator:
+    """
+    Runs a candidate model on copies of live traffic in a separate process.
+    
+    Requests are handed over through a bounded multiprocessing queue with
+    put_nowait, so the primary response never waits on the shadow model;
+    when the queue is full the copy is dropped and counted instead. The
+    shadow model runs in its own interpreter and does not compete for the
+    GIL of the serving worker; a thread in this process only waits on the
+    result queue to update the statistics. The process still needs CPU:
+    on hosts without a spare core every sampled copy competes with serving,
+    so only a small share of traffic is sampled by default.
+    """
+    
+    def __init__(self, key, model_path, vectorizer_path, cascade_threshold=0.9,
+                 max_queue=1000, sample_rate=0.1, latency_window=1000):
+        """
+        Start the shadow process.
+        
+        Args:
+            key: Registry key of the shadow model
+            model_path: Model pickle loaded by the shadow process
+            vectorizer_path: Vectorizer pickle loaded by the shadow process
+            cascade_threshold: Threshold of the shadow cascade for cascade requests
+            max_queue: Maximum number of pending batches
+            sample_rate: Fraction of primary requests copied to the shadow model
+            latency_window: Number of recent batches kept for latency percentiles
+        """
+        self.key = key
+        self.sample_rate = sample_rate
+        self._lock = threading.Condition()
+        self._primary_latency = deque(maxlen=latency_window)
+        self._shadow_latency = deque(maxlen=latency_window)
+        self._counts = {'submitted': 0, 'dropped': 0, 'evaluated': 0, 'agreed': 0, 'errors': 0}
+        self._completed = 0
+        self._ready = False
+        self._exited = False
+        self._closing = False
+        
+        # spawn: forking a multi-threaded server process is unsafe
+        context = multiprocessing.get_context('spawn')
+        self._requests = context.Queue(maxsize=max_queue)
+        self._results = context.Queue()
+        self._process = context.Process(
+            target=_shadow_worker,
+            args=(model_path, vectorizer_path, cascade_threshold, self._requests, self._results),
+            name=f"shadow-{key}", daemon=True
+        )
+        self._process.start()
+        self._collector = threading.Thread(target=self._collect, name=f"shadow-{key}-results", daemon=True)
+        self._collector.start()
+    
+    def submit(self, emails, primary_labels, primary_seconds, **options):
+        """
+        Queue a copy of a primary request for shadow evaluation.
+        
+        Args:
+            emails: Email texts classified by the primary model
+            primary_labels: Labels returned by the primary model (None for failures)
+            primary_seconds: Time the primary model took for this batch
+            **options: Path options of the primary request (mode,
+                probabilities, cascade, explain, top_k)
+            
+        Returns:
+            bool: False if the request was not sampled, the queue was full
+                or the shadow process has exited
+        """
+        if self.sample_rate < 1.0 and random.random() >= self.sample_rate:
+            return False
+        if self._exited or not self._process.is_alive():
+            return False
+        try:
+            self._requests.put_nowait((list(emails), list(primary_labels), primary_seconds, options))
+        except queue.Full:
+            with self._lock:
+                self._counts['dropped'] += 1
+            return False
+        with self._lock:
+            self._counts['submitted'] += 1
+        return True
+    
+    def _collect(self):
+        """Collector loop: record agreement and latency sent back by the shadow process."""
+        exited = False
+        while True:
+            try:
+                item = self._results.get(timeout=0.5)
+            except queue.Empty:
+                if exited:
+                    break
+                # Drain results sent before the process died, then stop
+                exited = not self._process.is_alive()
+                continue
+            if item == 'ready':
+                with self._lock:
+                    self._ready = True
+                    self._lock.notify_all()
+                continue
+            if item == 'stopped':
+                return
+            with self._lock:
+                if item is None:
+                    self._counts['errors'] += 1
+                else:
+                    compared, agreed, primary_seconds, shadow_seconds = item
+                    self._counts['evaluated'] += compared
+                    self._counts['agreed'] += agreed
+                    self._primary_latency.append(primary_seconds)
+                    self._shadow_latency.append(shadow_seconds)
+                self._completed += 1
+                self._lock.notify_all()
+        
+        with self._lock:
+            self._exited = True
+            self._lock.notify_all()
+        if self._closing:
+            return
+        stage = "" if self._ready else " before loading its model"
+        print(f"⚠️ Shadow process for {self.key} exited with code {self._process.exitcode}{stage}; "
+              f"shadow evaluation is disabled")
+    
+    @property
+    def pid(self):
+        """Process id of the shadow process."""
+        return self._process.pid
+    
+    def wait_ready(self, timeout=None):
+        """
+        Block until the shadow process has loaded its model.
+        
+        Returns:
+            bool: False if the timeout expired or the process exited first
+        """
+        with self._lock:
+            self._lock.wait_for(lambda: self._ready or self._exited, timeout=timeout)
+            return self._ready and not self._exited
+    
+    def join(self, timeout=None):
+        """
+        Block until every queued batch has been evaluated.
+        
+        Returns:
+            bool: False if the timeout expired first
+        """
+        with self._lock:
+            return self._lock.wait_for(
+                lambda: self._completed >= self._counts['submitted'] or not self._process.is_alive(),
+                timeout=timeout
+            )
+    
+    def close(self, timeout=5):
+        """Stop the shadow process and the collector thread."""
+        self._closing = True
+        try:
+            self._requests.put(None, timeout=timeout)
+        except queue.Full:
+            pass
+        self._process.join(timeout)
+        if self._process.is_alive():
+            self._process.terminate()
+            self._process.join()
+            self._results.put('stopped')
+        self._collector.join(timeout)
+    
+    @staticmethod
+    def _latency_summary(samples):
+        """Mean / p50 / p95 per-email latency in milliseconds."""
+        if not samples:
+            return None
+        values = np.asarray(samples) * 1000
+        return {
+            'mean_ms': round(float(values.mean()), 3),
+            'p50_ms': round(float(np.percentile(values, 50)), 3),
+            'p95_ms': round(float(np.percentile(values, 95)), 3)
+        }
+    
+    def get_stats(self):
+        """
+        Agreement and latency of the shadow model against the primary.
+        
+        Returns:
+            dict: Counters, agreement rate and per-email latency summaries
+        """
+        with self._lock:
+            counts = dict(self._counts)
+            completed = self._completed
+            primary = list(self._primary_latency)
+            shadow = list(self._shadow_latency)
+        return {
+            'model': self.key,
+            'sample_rate': self.sample_rate,
+            'running': self._process.is_alive(),
+            'ready': self._ready,
+            'exitcode': self._process.exitcode,
+            **counts,
+            'pending': counts['submitted'] - completed,
+            'agreement_rate': round(counts['agreed'] / counts['evaluated'], 4) if counts['evaluated'] else None,
+            'primary_latency': self._latency_summary(primary),
+            'shadow_latency': self._latency_summary(shadow)
+        }
+
+
+class ModelRegistry:
+    """
+    Holds several named and versioned EmailClassifiers in one process.
+    
+    Requests are routed by an explicit model header when it names a
+    registered model, otherwise by weighted random split.
+    """
+    
+    def __init__(self, cascade_threshold=0.9):
+        """
+        Create an empty registry.
+        
+        Args:
+            cascade_threshold: Confidence threshold of the per-model cascades
+        """
+        self.models = {}
+        self.weights = {}
+        self.default_key = None
+        self.shadow = None
+        self.cascade_threshold = cascade_threshold
+        self._cascades = {}
+        self._lock = threading.Lock()
+    
+    def register(self, name, version, classifier, weight=0, default=False):
+        """
+        Add a loaded classifier to the registry.
+        
+        Args:
+            name: Model name
+            version: Model version
+            classifier: Loaded EmailClassifier
+            weight: Share of unpinned traffic routed to this model
+            default: Serve this model when no weight or header applies
+            
+        Returns:
+            str: Registry key of the model
+        """
+        key = model_key(name, version)
+        self.models[key] = classifier
+        self.weights[key] = weight
+        if default or self.default_key is None:
+            self.default_key = key
+        return key
+    
+    def set_shadow(self, key, max_queue=1000, sample_rate=0.1):
+        """Start shadow evaluation of a registered model, stopping any previous one."""
+        if key not in self.models:
+            raise KeyError(f"Unknown model: {key}")
+        self.stop_shadow()
+        classifier = self.models[key]
+        self.shadow = ShadowEvaluator(key, classifier.model_path, classifier.vectorizer_path,
+                                      cascade_threshold=self.cascade_threshold,
+                                      max_queue=max_queue, sample_rate=sample_rate)
+    
+    def stop_shadow(self):
+        """Stop shadow evaluation, if running."""
+        if self.shadow is not None:
+            self.shadow.close()
+            self.shadow = None
+    
+    def resolve(self, requested=None):
+        """
+        Pick the model for a request.
+        
+        Args:
+            requested: Header value, either a full 'name:version' key or a
+                name (resolved to the most recently registered version)
+                
+        Returns:
+            Tuple of (key, classifier)
+        
+        Raises:
+            KeyError: If the requested model is not registered
+        """
+        if requested:
+            if requested in self.models:
+                return requested, self.models[requested]
+            matches = [key for key in self.models if key.split(':', 1)[0] == requested]
+            if not matches:
+                raise KeyError(f"Unknown model: {requested}")
+            return matches[-1], self.models[matches[-1]]
+        
+        weighted = [(key, weight) for key, weight in self.weights.items() if weight > 0]
+        if weighted:
+            keys, weights = zip(*weighted)
+            key = random.choices(keys, weights=weights)[0]
+        else:
+            key = self.default_key
+        return key, self.models[key]
+    
+    def cascade(self, key):
+        """Cascade in front of a registered model, built on first use (None if not loaded)."""
+        if self.models[key].model is None:
+            return None
+        with self._lock:
+            if key not in self._cascades:
+                self._cascades[key] = CascadeClassifier(self.models[key], threshold=self.cascade_threshold)
+            return self._cascades[key]
+    
+    def built_cascades(self):
+        """Cascades built so far, by model key."""
+        with self._lock:
+            return dict(self._cascades)
+    
+    def submit_shadow(self, key, emails, primary_labels, primary_seconds, **options):
+        """Hand a copy of primary traffic and its path options to the shadow model, if any."""
+        if self.shadow is not None and key != self.shadow.key:
+            self.shadow.submit(emails, primary_labels, primary_seconds, **options)
+    
+    def describe(self):
+        """
+        Registered models, routing weights and shadow statistics.
+        
+        Returns:
+            dict: Summary suitable for a JSON response
+        """
+        total_weight = sum(self.weights.values())
+        return {
+            'default': self.default_key,
+            'models': [
+                {
+                    'key': key,
+                    'loaded': classifier.model is not None,
+                    'weight': self.weights[key],
+                    'traffic_share': round(self.weights[key] / total_weight, 4) if total_weight else None
+                }
+                for key, classifier in self.models.items()
+            ],
+            'shadow': self.shadow.get_stats() if self.shadow is not None else None
+        }
+    
+    @classmethod
+    def from_config(cls, path, cascade_threshold=0.9):
+        """
+        Build a registry from a JSON config file (see module docstring).
+        
+        Relative model paths are resolved against the project root.
+        """
+        base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        with open(path, 'r', encoding='utf-8') as f:
+            config = json.load(f)
+        
+        registry = cls(cascade_threshold=cascade_threshold)
+        for entry in config['models']:
+            classifier = EmailClassifier(
+                model_path=os.path.join(base_dir, entry['model_path']),
+                vectorizer_path=os.path.join(base_dir, entry['vectorizer_path'])
+            )
+            registry.register(entry['name'], entry['version'], classifier,
+                              weight=entry.get('weight', 0))
+        if config.get('default'):
+            if config['default'] not in registry.models:
+                raise KeyError(f"Unknown default model: {config['default']}")
+            registry.default_key = config['default']
+        if config.get('shadow'):
+            registry.set_shadow(config['shadow'],
+                                max_queue=config.get('shadow_queue_size', 1000),
+                                sample_rate=config.get('shadow_sample_rate', 0.1))
+        return registry
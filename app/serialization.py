@@ -0,0 +1,246 @@
+"""
+Fast Response Serialization
+Compact encoders used by the lean response mode and the binary
+(MessagePack / Arrow IPC) batch transport of the API
+"""
+
+import json
+
+import numpy as np
+from fastapi.responses import Response
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is optional
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - msgpack is optional
+    msgpack = None
+
+try:
+    import pyarrow as pa
+except ImportError:  # pragma: no cover - pyarrow is optional
+    pa = None
+
+
+def _to_builtin(obj):
+    """Convert numpy values to plain Python types for the stdlib encoder."""
+    if isinstance(obj, np.ndarray):
+        # NaN marks rows that could not be classified; encode them as null
+        if obj.dtype.kind == 'f':
+            obj = np.where(np.isnan(obj), None, obj)
+        return obj.tolist()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps_json(content):
+    """
+    Serialize content to compact JSON bytes.
+    
+    Uses orjson (with native numpy support) when installed and falls back
+    to the standard library encoder otherwise.
+    
+    Args:
+        content: JSON-compatible object, may contain numpy arrays
+        
+    Returns:
+        bytes: UTF-8 encoded JSON
+    """
+    if orjson is not None:
+        return orjson.dumps(content, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(content, separators=(',', ':'),
+                      default=_to_builtin).encode('utf-8')
+
+
+class LeanJSONResponse(Response):
+    """JSON response rendered with the fast encoder, skipping response_model validation."""
+    media_type = "application/json"
+    
+    def render(self, content):
+        return dumps_json(content)
+
+
+# ============================================
+# BINARY BATCH TRANSPORT (MessagePack / Arrow)
+# ============================================
+
+JSON_MEDIA_TYPE = "application/json"
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+ARROW_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+
+_MEDIA_TYPE_ALIASES = {
+    "application/x-msgpack": MSGPACK_MEDIA_TYPE,
+    "application/vnd.msgpack": MSGPACK_MEDIA_TYPE,
+    "application/vnd.apache.arrow.file": ARROW_MEDIA_TYPE,
+}
+
+# Column holding the email texts in Arrow requests
+ARROW_TEXT_COLUMN = "email"
+
+
+def normalize_media_type(value):
+    """Strip parameters from a Content-Type/Accept entry and resolve aliases."""
+    media_type = (value or "").split(';', 1)[0].strip().lower()
+    return _MEDIA_TYPE_ALIASES.get(media_type, media_type)
+
+
+def binary_available(media_type):
+    """Check whether the optional encoder for a binary media type is installed."""
+    if media_type == MSGPACK_MEDIA_TYPE:
+        return msgpack is not None
+    if media_type == ARROW_MEDIA_TYPE:
+        return pa is not None
+    return False
+
+
+def _parse_accept(accept):
+    """Yield (media type, q) pairs from an Accept header, skipping malformed q values."""
+    for entry in (accept or "").split(','):
+        media_type = normalize_media_type(entry)
+        if not media_type:
+            continue
+        q = 1.0
+        for param in entry.split(';')[1:]:
+            name, _, value = param.partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = None
+        if q is not None and 0 <= q <= 1:
+            yield media_type, q
+
+
+def negotiate_media_type(accept, default=JSON_MEDIA_TYPE):
+    """
+    Pick the response media type from an Accept header.
+    
+    The supported type with the highest q value wins, earlier entries
+    breaking ties; ``q=0`` marks a type as not acceptable. Wildcards apply
+    their q value to the default type.
+    
+    Args:
+        accept: Raw Accept header value (may be None)
+        default: Media type used for missing or wildcard Accept headers
+        
+    Returns:
+        str or None: One of the JSON, MessagePack or Arrow media types, or
+            None when the header rules out every supported type
+    """
+    explicit = {}
+    wildcard = None
+    for media_type, q in _parse_accept(accept):
+        if media_type in (MSGPACK_MEDIA_TYPE, ARROW_MEDIA_TYPE, JSON_MEDIA_TYPE):
+            explicit.setdefault(media_type, q)
+        elif media_type in ('*/*', 'application/*'):
+            wildcard = q if wildcard is None else max(wildcard, q)
+    
+    # None: the header expresses no preference about the default type
+    default_q = explicit.get(default, wildcard)
+    
+    best, best_q = None, 0.0
+    for media_type, q in explicit.items():
+        if q > best_q:
+            best, best_q = media_type, q
+    if best is not None and (default_q is None or best_q >= default_q):
+        return best
+    if default_q is None or default_q > 0:
+        return default
+    return None
+
+
+def decode_batch_request(body, media_type):
+    """
+    Decode a binary batch request into a list of email texts.
+    
+    MessagePack bodies are either a bare array of strings or a map with an
+    ``emails`` array. Arrow bodies are an IPC stream with a non-null
+    ``email`` string column.
+    
+    Args:
+        body: Raw request bytes
+        media_type: Normalized request media type
+        
+    Returns:
+        list: Email texts
+        
+    Raises:
+        ValueError: If the body cannot be decoded
+    """
+    if media_type == MSGPACK_MEDIA_TYPE:
+        payload = msgpack.unpackb(body, raw=False)
+        if isinstance(payload, dict):
+            payload = payload.get('emails')
+        if not isinstance(payload, list) or not all(isinstance(e, str) for e in payload):
+            raise ValueError("MessagePack body must be a list of strings or a map with an 'emails' list")
+        return payload
+    
+    if media_type == ARROW_MEDIA_TYPE:
+        table = pa.ipc.open_stream(body).read_all()
+        if ARROW_TEXT_COLUMN not in table.column_names:
+            raise ValueError(f"Arrow body must contain an '{ARROW_TEXT_COLUMN}' column")
+        column = table.column(ARROW_TEXT_COLUMN)
+        if not (pa.types.is_string(column.type) or pa.types.is_large_string(column.type)):
+            raise ValueError(f"Arrow '{ARROW_TEXT_COLUMN}' column must be a string column, got {column.type}")
+        if column.null_count:
+            raise ValueError(f"Arrow '{ARROW_TEXT_COLUMN}' column must not contain nulls")
+        return column.to_pylist()
+    
+    raise ValueError(f"Unsupported media type: {media_type}")
+
+
+def encode_batch_response(result, media_type):
+    """
+    Encode a lean batch result as MessagePack or Arrow IPC.
+    
+    Both formats carry a label column and a float32 probability matrix in
+    the fixed class order, so clients can decode the matrix without copying
+    (``np.frombuffer`` for MessagePack, ``to_numpy`` on the flattened list
+    values for Arrow). Rows that could not be classified have a null label
+    and NaN probabilities.
+    
+    Args:
+        result: Output of EmailClassifier.predict_lean
+        media_type: Normalized response media type
+        
+    Returns:
+        bytes: Encoded response body
+    """
+    classes = result['classes']
+    probabilities = result.get('probabilities')
+    if probabilities is not None:
+        probabilities = np.ascontiguousarray(probabilities, dtype='<f4')
+    
+    if media_type == MSGPACK_MEDIA_TYPE:
+        content = {
+            'count': len(result['labels']),
+            'classes': classes,
+            'labels': result['labels']
+        }
+        if probabilities is not None:
+            content['probabilities'] = {
+                'dtype': '<f4',
+                'shape': list(probabilities.shape),
+                'data': probabilities.tobytes()
+            }
+        return msgpack.packb(content, use_bin_type=True)
+    
+    if media_type == ARROW_MEDIA_TYPE:
+        columns = {'label': pa.array(result['labels'], type=pa.string())}
+        if probabilities is not None:
+            columns['probabilities'] = pa.FixedSizeListArray.from_arrays(
+                pa.array(probabilities.ravel(), type=pa.float32()), len(classes)
+            )
+        table = pa.table(columns).replace_schema_metadata(
+            {'classes': json.dumps(classes)}
+        )
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        return sink.getvalue().to_pybytes()
+    
+    raise ValueError(f"Unsupported media type: {media_type}")
@@ -0,0 +1,143 @@
+"""
+Labeling Parity Tests
+KeywordLabeler must label exactly like the notebook's classify_email, which is
+loaded from the Activity 1.4 cell of Email_Classification_System_(2).ipynb
+
+Run with pytest, or directly: python app/test_labeling.py
+"""
+
+import ast
+import json
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+from app import labeling
+from app.labeling import KeywordLabeler
+
+NOTEBOOK_PATH = os.path.join(ROOT, 'Email_Classification_System_(2).ipynb')
+
+
+def _load_notebook_rules():
+    """classify_email and its keyword lists, as defined in the notebook's Activity 1.4 cell."""
+    with open(NOTEBOOK_PATH, 'r', encoding='utf-8') as f:
+        cells = json.load(f)['cells']
+    source = next(''.join(cell['source']) for cell in cells
+                  if cell['cell_type'] == 'code' and 'def classify_email' in ''.join(cell['source']))
+    # Only the function definitions; the rest of the cell needs the dataset
+    source = source.split('# Create a copy of the dataframe')[0]
+    
+    namespace = {'pd': pd}
+    exec(source, namespace)
+    keywords = {
+        node.targets[0].id: ast.literal_eval(node.value)
+        for node in ast.walk(ast.parse(source))
+        if isinstance(node, ast.Assign) and node.targets[0].id.endswith('_keywords')
+    }
+    return namespace['classify_email'], keywords
+
+
+classify_email, NOTEBOOK_KEYWORDS = _load_notebook_rules()
+
+# Keywords inside longer words ('hr' in 'three', 'tax' in 'syntax'),
+# overlapping keywords ('staff' / 'financial', 'leave' / 'leaves'),
+# mixed case, spacing and priority order
+SUBSTRING_CASES = [
+    "Three staffinancial accountax items",
+    "SyNtAx of the HRIS export",
+    "staff leave",
+    "Leaves are falling",
+    "Through the chronicle",
+    "purchase  order",
+    "Purchase Order #42",
+    "annual report attached",
+    "The BUDGET for the Urgent offsite",
+    "Salary review, payment due ASAP",
+    "Lunch on friday?",
+    "no keywords here at all",
+    "URGENT",
+    "   ",
+]
+
+MISSING_CASES = ["", None, float('nan'), np.nan, pd.NA, pd.NaT, np.float64('nan')]
+
+NON_STRING_CASES = [12345, 3.5, True]
+
+ALL_CASES = SUBSTRING_CASES + MISSING_CASES + NON_STRING_CASES
+
+
+def _labelers():
+    """The compiled labeler and its substring fallback."""
+    compiled = KeywordLabeler()
+    fallback = KeywordLabeler()
+    fallback.automaton = None
+    return [compiled, fallback]
+
+
+def test_keyword_lists_match_notebook():
+    """The labeler's keyword lists are the notebook's, in the same priority order."""
+    assert labeling.URGENT_KEYWORDS == NOTEBOOK_KEYWORDS['urgent_keywords']
+    assert labeling.FINANCIAL_KEYWORDS == NOTEBOOK_KEYWORDS['financial_keywords']
+    assert labeling.HR_KEYWORDS == NOTEBOOK_KEYWORDS['hr_keywords']
+    for text in ALL_CASES:
+        assert labeling.classify_email(text) == classify_email(text), repr(text)
+
+
+def test_label_matches_classify_email():
+    """Single-text labels match the notebook rules, with and without the automaton."""
+    for labeler in _labelers():
+        for text in ALL_CASES:
+            assert labeler.label(text) == classify_email(text), repr(text)
+
+
+def test_missing_values_are_general():
+    """Missing and empty bodies get the default category without raising."""
+    labeler = KeywordLabeler()
+    for text in MISSING_CASES:
+        assert labeler.label(text) == 'General', repr(text)
+        assert classify_email(text) == 'General', repr(text)
+
+
+def test_label_many_in_process():
+    """label_many keeps input order and matches classify_email."""
+    texts = ALL_CASES * 3
+    labels = KeywordLabeler().label_many(texts)
+    assert labels == [classify_email(text) for text in texts]
+
+
+def test_label_many_multiprocess():
+    """The chunked worker-pool path returns the same labels in the same order."""
+    texts = ALL_CASES * 20
+    labels = KeywordLabeler().label_many(texts, n_jobs=2, chunk_size=7)
+    assert labels == [classify_email(text) for text in texts]
+
+
+def test_pandas_series():
+    """Labels of a DataFrame column with missing values match the notebook's apply."""
+    series = pd.Series(SUBSTRING_CASES + MISSING_CASES, dtype=object)
+    labels = KeywordLabeler().label_many(series)
+    assert labels == series.apply(classify_email).tolist()
+
+
+if __name__ == "__main__":
+    tests = [
+        test_keyword_lists_match_notebook,
+        test_label_matches_classify_email,
+        test_missing_values_are_general,
+        test_label_many_in_process,
+        test_label_many_multiprocess,
+        test_pandas_series,
+    ]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"✅ {test.__name__}")
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ {test.__name__}: {e}")
+    sys.exit(1 if failed else 0)
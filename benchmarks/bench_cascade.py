@@ -0,0 +1,78 @@
+"""
+Model Cascade Benchmark
+Per-tier hit rates, agreement with the full model and end-to-end throughput
+
+Usage:
+    python benchmarks/bench_cascade.py [path/to/emails.csv]
+
+With the Enron emails.csv the notebook's test split is used as the
+evaluation set; otherwise synthetic emails are used.
+"""
+
+import sys
+
+from common import sample_emails, best_of
+from app.predictor import EmailClassifier
+from app.cascade import CascadeClassifier
+from app.dataset import prepare_dataset, notebook_split
+
+THRESHOLDS = [0.8, 0.9, 0.95, 0.99]
+
+
+def load_emails(classifier, csv_path=None, limit=5000):
+    """Raw email bodies of the evaluation set."""
+    if csv_path:
+        df = prepare_dataset(csv_path, classifier.preprocess_text)
+        _, test_texts, _, _ = notebook_split(df)
+        return df.loc[test_texts.index, 'email_body'].tolist()[:limit]
+    return sample_emails(limit)
+
+
+def labels_of(results):
+    return [r.get('predicted_category') for r in results]
+
+
+def run_benchmark(csv_path=None):
+    classifier = EmailClassifier()
+    emails = load_emails(classifier, csv_path)
+    
+    full_seconds, full_results = best_of(lambda: classifier.predict_batch(emails), repeat=1)
+    full_labels = labels_of(full_results)
+    
+    print("\n" + "="*72)
+    print(f"🪜 MODEL CASCADE BENCHMARK ({len(emails):,} emails)")
+    print("="*72)
+    print(f"{'threshold':>10} {'fast hits':>10} {'escalated':>10} {'agreement':>10} "
+          f"{'emails/s':>10} {'speedup':>8}")
+    print(f"{'full only':>10} {'':>10} {'':>10} {'':>10} "
+          f"{len(emails) / full_seconds:>10,.0f} {'1.00x':>8}")
+    
+    for threshold in THRESHOLDS:
+        cascade = CascadeClassifier(classifier, threshold=threshold)
+        seconds, results = best_of(lambda: cascade.predict_batch(emails), repeat=1)
+        stats = cascade.get_stats()
+        agreement = sum(a == b for a, b in zip(labels_of(results), full_labels)) / len(emails)
+        print(f"{threshold:>10} {stats['fast_rate']:>9.1%} {stats['full_rate']:>9.1%} "
+              f"{agreement:>9.2%} {len(emails) / seconds:>10,.0f} {full_seconds / seconds:>7.2f}x")
+    
+    # Lean (array) path: the full model is already vectorized, so the gain is smaller
+    lean_seconds, lean_result = best_of(
+        lambda: classifier.predict_lean(emails, include_probabilities=False), repeat=1)
+    print(f"\n{'lean':>10} {'fast hits':>10} {'escalated':>10} {'agreement':>10} "
+          f"{'emails/s':>10} {'speedup':>8}")
+    print(f"{'full only':>10} {'':>10} {'':>10} {'':>10} "
+          f"{len(emails) / lean_seconds:>10,.0f} {'1.00x':>8}")
+    for threshold in THRESHOLDS:
+        cascade = CascadeClassifier(classifier, threshold=threshold)
+        seconds, result = best_of(
+            lambda: cascade.predict_lean(emails, include_probabilities=False), repeat=1)
+        stats = cascade.get_stats()
+        agreement = sum(a == b for a, b in zip(result['labels'], lean_result['labels'])) / len(emails)
+        print(f"{threshold:>10} {stats['fast_rate']:>9.1%} {stats['full_rate']:>9.1%} "
+              f"{agreement:>9.2%} {len(emails) / seconds:>10,.0f} {lean_seconds / seconds:>7.2f}x")
+    
+    print("="*72)
+
+
+if __name__ == "__main__":
+    run_benchmark(sys.argv[1] if len(sys.argv) > 1 else None)
@@ -0,0 +1,99 @@
+"""
+Model Compression Benchmark
+Accuracy, memory and speed of pruned / reduced-precision artifacts
+
+Usage:
+    python benchmarks/bench_compression.py [path/to/emails.csv]
+
+With the Enron emails.csv the accuracy change is measured on the notebook's
+test split; without it, agreement with the original model is reported on
+synthetic emails.
+"""
+
+import os
+import sys
+import tempfile
+
+import numpy as np
+
+from common import sample_emails, best_of
+from app.predictor import EmailClassifier
+from app.compression import compress, save
+from app.dataset import prepare_dataset, notebook_split
+
+SETTINGS = [
+    (0.0, 'float32'),
+    (0.0, 'float16'),
+    (0.5, 'float16'),
+    (1.0, 'float16'),
+    (1.5, 'float16'),
+    (2.0, 'float16'),
+]
+
+
+def memory_bytes(classifier):
+    """Approximate resident size of the vocabulary dict and parameter arrays."""
+    vocabulary = classifier.vectorizer.vocabulary_
+    size = sys.getsizeof(vocabulary)
+    size += sum(sys.getsizeof(term) + sys.getsizeof(index) for term, index in vocabulary.items())
+    size += classifier.vectorizer.idf_.nbytes
+    size += classifier.model.coef_.nbytes + classifier.model.intercept_.nbytes
+    return size
+
+
+def predict_labels(classifier, texts):
+    """Transform and predict pre-cleaned texts, returning (labels, best seconds)."""
+    seconds, labels = best_of(
+        lambda: classifier.model.predict(classifier.vectorizer.transform(texts)), repeat=3
+    )
+    return labels, seconds
+
+
+def run_benchmark(csv_path=None):
+    original = EmailClassifier()
+    
+    if csv_path:
+        df = prepare_dataset(csv_path, original.preprocess_text)
+        _, texts, _, reference = notebook_split(df)
+        texts, reference = list(texts), np.asarray(reference)
+        metric = 'accuracy'
+    else:
+        texts = [original.preprocess_text(e) for e in sample_emails(20_000)]
+        reference = None
+        metric = 'agreement'
+    
+    base_labels, base_seconds = predict_labels(original, texts)
+    if reference is None:
+        reference = base_labels
+    base_score = np.mean(base_labels == reference)
+    base_disk = os.path.getsize(original.model_path) + os.path.getsize(original.vectorizer_path)
+    base_memory = memory_bytes(original)
+    
+    print("\n" + "="*86)
+    print(f"🗜️ MODEL COMPRESSION BENCHMARK ({len(texts):,} texts, {metric})")
+    print("="*86)
+    print(f"{'min weight':>10} {'dtype':<8} {'features':>9} {metric:>10} {'change':>8} "
+          f"{'disk KB':>9} {'memory KB':>10} {'speedup':>8}")
+    print(f"{'original':>10} {'float64':<8} {len(original.vectorizer.vocabulary_):>9,} "
+          f"{base_score:>10.4f} {'':>8} {base_disk / 1024:>9.1f} {base_memory / 1024:>10.1f} {'1.00x':>8}")
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        for min_weight, dtype in SETTINGS:
+            model, vectorizer, keep = compress(original.model, original.vectorizer, min_weight, dtype)
+            output_dir = os.path.join(tmp, f"{min_weight}-{dtype}")
+            model_path, vectorizer_path = save(model, vectorizer, output_dir)
+            
+            compressed = EmailClassifier(model_path=model_path, vectorizer_path=vectorizer_path)
+            labels, seconds = predict_labels(compressed, texts)
+            score = np.mean(labels == reference)
+            disk = os.path.getsize(model_path) + os.path.getsize(vectorizer_path)
+            
+            print(f"{min_weight:>10} {dtype:<8} {keep.sum():>9,} {score:>10.4f} "
+                  f"{(score - base_score) * 100:>+7.2f}% {disk / 1024:>9.1f} "
+                  f"{memory_bytes(compressed) / 1024:>10.1f} {base_seconds / seconds:>7.2f}x")
+    
+    print("="*86)
+
+
+if __name__ == "__main__":
+    run_benchmark(sys.argv[1] if len(sys.argv) > 1 else None)
@@ -0,0 +1,102 @@
+"""
+Near-Duplicate Detection Benchmark
+Net time saved by classifying one email per near-duplicate cluster,
+against classifying every email on the lean and full paths
+
+Usage:
+    python benchmarks/bench_dedup.py [path/to/emails.csv]
+
+With the Enron emails.csv the notebook-cleaned email bodies are used;
+otherwise a synthetic archive of newsletters sent to different recipients
+and reply chains is generated.
+"""
+
+import random
+import sys
+
+from common import sample_emails, best_of
+from app.predictor import EmailClassifier
+from app.dedup import deduplicate, expand_lean, expand_results
+from app.dataset import prepare_dataset
+
+THRESHOLDS = [0.5, 0.7, 0.8, 0.9]
+REPEAT = 3
+NAMES = ["John", "Maria", "Sally", "Vince", "Kenneth", "Louise", "Greg", "Tana"]
+
+
+def synthetic_archive(n_unique=500, copies=4, seed=7):
+    """Unique emails plus near-duplicate variants (recipient swaps, replies, footers)."""
+    rng = random.Random(seed)
+    archive = []
+    for body in sample_emails(n_unique, seed=seed):
+        archive.append(f"Dear {rng.choice(NAMES)}, {body}")
+        for _ in range(rng.randint(0, copies)):
+            variant = rng.choice([
+                lambda: f"Dear {rng.choice(NAMES)}, {body}",
+                lambda: f"Thanks, see below.\n> Dear {rng.choice(NAMES)}, {body}",
+                lambda: f"Dear {rng.choice(NAMES)}, {body}\n-- Sent from my BlackBerry",
+            ])
+            archive.append(variant())
+    rng.shuffle(archive)
+    return archive
+
+
+def measure(classifier, emails, threshold, lean):
+    """Cluster report, seconds of clustering and of classifying the representatives, fanned-out labels."""
+    dedup_seconds, (assignments, representatives, report) = best_of(
+        lambda: deduplicate(emails, threshold), repeat=REPEAT)
+    subset = [emails[i] for i in representatives]
+    if lean:
+        seconds, result = best_of(lambda: classifier.predict_lean(subset, include_probabilities=False),
+                                  repeat=REPEAT)
+        labels = expand_lean(result, assignments)['labels']
+    else:
+        seconds, results = best_of(lambda: classifier.predict_batch(subset), repeat=REPEAT)
+        labels = [r.get('predicted_category') for r in expand_results(results, assignments, representatives)]
+    return report, dedup_seconds, seconds, labels
+
+
+def run_workload(classifier, name, emails):
+    print(f"\n🧬 {name} ({len(emails):,} emails)")
+    print(f"{'path':>6} {'threshold':>10} {'clusters':>9} {'saved':>7} {'dedup s':>8} "
+          f"{'infer s':>8} {'baseline s':>11} {'net saved':>10} {'agreement':>10}")
+    
+    for lean in (True, False):
+        path = 'lean' if lean else 'full'
+        if lean:
+            baseline, result = best_of(lambda: classifier.predict_lean(emails, include_probabilities=False),
+                                       repeat=REPEAT)
+            baseline_labels = result['labels']
+        else:
+            baseline, results = best_of(lambda: classifier.predict_batch(emails), repeat=REPEAT)
+            baseline_labels = [r.get('predicted_category') for r in results]
+        
+        for threshold in THRESHOLDS:
+            report, dedup_seconds, seconds, labels = measure(classifier, emails, threshold, lean)
+            net = baseline - dedup_seconds - seconds
+            agreement = sum(a == b for a, b in zip(labels, baseline_labels)) / len(emails)
+            print(f"{path:>6} {threshold:>10} {report['clusters']:>9,} {report['inference_saved_rate']:>6.1%} "
+                  f"{dedup_seconds:>8.3f} {seconds:>8.3f} {baseline:>11.3f} "
+                  f"{net / baseline:>+9.1%} {agreement:>9.2%}")
+
+
+def run_benchmark(csv_path=None):
+    classifier = EmailClassifier()
+    if csv_path:
+        df = prepare_dataset(csv_path, classifier.preprocess_text)
+        workload = ("Enron email bodies", df['email_body'].tolist()[:20_000])
+    else:
+        workload = ("Synthetic archive with near-duplicates", synthetic_archive())
+    
+    print("\n" + "="*92)
+    print("🧬 NEAR-DUPLICATE DETECTION BENCHMARK")
+    print("   net saved = baseline - (dedup + inference on representatives), relative to baseline")
+    print("="*92)
+    run_workload(classifier, *workload)
+    # Worst case: clustering cost with nothing to save
+    run_workload(classifier, "Unique emails (no duplicates)", sample_emails(2000, seed=3))
+    print("="*92)
+
+
+if __name__ == "__main__":
+    run_benchmark(sys.argv[1] if len(sys.argv) > 1 else None)
@@ -0,0 +1,84 @@
+"""
+Corpus Labeling Benchmark
+Parity of the compiled keyword labeler with the notebook's rules, and throughput
+
+Usage:
+    python benchmarks/bench_labeling.py [path/to/emails.csv]
+
+With the Enron emails.csv every message body is labeled; otherwise a
+synthetic corpus is used.
+"""
+
+import os
+import sys
+import time
+
+import pandas as pd
+
+from common import sample_emails
+from app.dataset import extract_email_body
+from app.labeling import KeywordLabeler, classify_email, ahocorasick
+
+# Substring edge cases: keywords inside words, overlapping keywords,
+# mixed case, missing and empty bodies
+EDGE_CASES = [
+    "Three staffinancial accountax items", "SyNtAx of the HRIS export",
+    "staff leave", "Leaves are falling", "no keywords here at all",
+    "URGENT", "purchase  order", "annual report attached",
+    "", None, float('nan'), 12345,
+]
+
+
+def load_corpus(csv_path=None, n=200_000):
+    if csv_path:
+        return pd.read_csv(csv_path)['message'].apply(extract_email_body).tolist()
+    return sample_emails(n) + EDGE_CASES
+
+
+def check_parity(labeler, texts):
+    """Labels must match the notebook's classify_email for every text."""
+    mismatches = [
+        (text, expected, actual)
+        for text, expected, actual in zip(texts, map(classify_email, texts), map(labeler.label, texts))
+        if expected != actual
+    ]
+    assert not mismatches, f"{len(mismatches)} mismatches, e.g. {mismatches[:3]}"
+
+
+def throughput(func, texts):
+    start = time.perf_counter()
+    func(texts)
+    seconds = time.perf_counter() - start
+    return len(texts) / seconds, seconds
+
+
+def run_benchmark(csv_path=None):
+    texts = load_corpus(csv_path)
+    labeler = KeywordLabeler()
+    
+    check_parity(labeler, texts)
+    
+    rows = [
+        ('notebook classify_email', lambda t: [classify_email(x) for x in t]),
+        ('KeywordLabeler', lambda t: labeler.label_many(t)),
+        (f'KeywordLabeler n_jobs={os.cpu_count()}', lambda t: labeler.label_many(t, n_jobs=-1)),
+    ]
+    
+    print("\n" + "="*68)
+    print(f"🏷️ CORPUS LABELING BENCHMARK ({len(texts):,} emails)")
+    print("="*68)
+    print(f"   Matcher: {'Aho-Corasick automaton' if ahocorasick else 'substring fallback'}")
+    print(f"   Parity with notebook labels: ✅ {len(texts):,} / {len(texts):,}")
+    print(f"\n   {'labeler':<30} {'emails/s':>12} {'seconds':>9} {'speedup':>8}")
+    
+    baseline = None
+    for name, func in rows:
+        rate, seconds = throughput(func, texts)
+        baseline = baseline or rate
+        print(f"   {name:<30} {rate:>12,.0f} {seconds:>9.2f} {rate / baseline:>7.2f}x")
+    
+    print("="*68)
+
+
+if __name__ == "__main__":
+    run_benchmark(sys.argv[1] if len(sys.argv) > 1 else None)
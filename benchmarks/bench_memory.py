@@ -0,0 +1,63 @@
+"""
+Memory Footprint Benchmark
+Per-component sizes of a loaded worker vs. tracemalloc and RSS
+"""
+
+import time
+import tracemalloc
+
+from common import sample_emails
+from app.predictor import EmailClassifier
+from app.registry import ModelRegistry
+from app import memory
+
+
+def run_benchmark():
+    rss_before = memory.process_rss_bytes()
+    tracemalloc.start()
+    
+    registry = ModelRegistry()
+    classifier = EmailClassifier()
+    registry.register('email-classifier', '1.0.0', classifier)
+    classifier.enable_monitoring(window_seconds=60)
+    # Load WordNet, then warm up the cascade and monitor
+    memory.load_wordnet()
+    registry.cascade(registry.default_key).predict_batch(sample_emails(500))
+    
+    traced, peak = tracemalloc.get_traced_memory()
+    sites = memory.top_allocations(5)
+    tracemalloc.stop()
+    
+    # The first report walks WordNet; later ones reuse its cached size
+    start = time.perf_counter()
+    report = memory.registry_report(registry)
+    first_report = time.perf_counter() - start
+    start = time.perf_counter()
+    memory.registry_report(registry)
+    cached_report = time.perf_counter() - start
+    
+    mb = 1024 * 1024
+    print("\n" + "="*60)
+    print("🧠 MEMORY FOOTPRINT BENCHMARK")
+    print("="*60)
+    for key, model in report['models'].items():
+        print(f"   {key}")
+        for name, size in sorted(model['components'].items(), key=lambda item: -item[1]):
+            print(f"      {name:<18} {size / mb:>8.2f} MB")
+    for name, size in report['shared'].items():
+        print(f"   shared/{name:<14} {size / mb:>8.2f} MB")
+    print(f"   Component estimate:   {report['estimated_bytes'] / mb:>8.2f} MB")
+    print(f"   Traced allocations:   {traced / mb:>8.2f} MB (peak {peak / mb:.2f} MB)")
+    if rss_before and report['rss_bytes']:
+        print(f"   RSS growth:           {(report['rss_bytes'] - rss_before) / mb:>8.2f} MB")
+        print(f"   RSS total:            {report['rss_bytes'] / mb:>8.2f} MB")
+        print(f"   Unattributed RSS:     {report['unattributed_bytes'] / mb:>8.2f} MB")
+    print(f"   registry_report():    {first_report * 1e3:>8.1f} ms first, {cached_report * 1e3:.1f} ms cached")
+    print("   Top allocation sites:")
+    for site in sites:
+        print(f"      {site['size_bytes'] / mb:>6.2f} MB  {site['site']}")
+    print("="*60)
+
+
+if __name__ == "__main__":
+    run_benchmark()
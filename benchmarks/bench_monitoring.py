@@ -0,0 +1,96 @@
+"""
+Traffic Monitoring Benchmark
+Per-request overhead of the streaming drift sketches, including traffic
+dominated by out-of-vocabulary tokens, and per-batch overhead on the lean path
+"""
+
+import random
+import string
+import time
+
+from common import sample_emails, best_of
+from app.predictor import EmailClassifier
+
+NAMES = ["kaminski", "shackleton", "skilling", "lavorato", "beck", "dasovich", "mcconnell"]
+
+
+def unseen_tokens(rng, n):
+    """Tokens a vocabulary never sees: names, ticket ids and pasted hashes / log fields."""
+    tokens = []
+    for _ in range(n):
+        kind = rng.random()
+        if kind < 0.3:
+            tokens.append(rng.choice(NAMES))
+        elif kind < 0.6:
+            tokens.append(f"ticket{rng.randint(10000, 10500)}")
+        else:
+            tokens.append(''.join(rng.choices(string.ascii_lowercase + string.digits, k=rng.randint(6, 16))))
+    return tokens
+
+
+def workloads(n):
+    """In-vocabulary, typical (about 20 unseen tokens) and OOV-heavy (about 300 unseen tokens) emails."""
+    rng = random.Random(7)
+    base = sample_emails(n)
+    return {
+        'in-vocabulary': base,
+        'typical (~20 unseen)': [f"{e} {' '.join(unseen_tokens(rng, 20))}" for e in base],
+        'OOV-heavy (~300 unseen)': [f"{e} {' '.join(unseen_tokens(rng, 300))}" for e in base],
+    }
+
+
+def run_benchmark(n=1000):
+    print("\n" + "="*72)
+    print("📈 TRAFFIC MONITORING BENCHMARK")
+    print("="*72)
+    print(f"{'workload':>24} {'no monitor':>11} {'monitor':>10} {'record()':>10} {'OOV rate':>9}")
+    
+    for name, emails in workloads(n).items():
+        classifier = EmailClassifier()
+        cleaned = [classifier.preprocess_text(e) for e in emails]
+        
+        plain, _ = best_of(lambda: [classifier.predict(e) for e in emails], repeat=3)
+        monitor = classifier.enable_monitoring(window_seconds=60)
+        monitored, _ = best_of(lambda: [classifier.predict(e) for e in emails], repeat=3)
+        
+        start = time.perf_counter()
+        for text in cleaned:
+            monitor.record(text, 'General', 0.9)
+        record_only = (time.perf_counter() - start) / len(cleaned)
+        
+        oov_rate = monitor.snapshot()['cumulative']['oov_rate']
+        print(f"{name:>24} {plain / n * 1e6:>8.1f} µs {monitored / n * 1e6:>7.1f} µs "
+              f"{record_only * 1e6:>7.1f} µs {oov_rate:>9}")
+    
+    classifier = EmailClassifier()
+    monitor = classifier.enable_monitoring(window_seconds=60)
+    start = time.perf_counter()
+    snapshot = monitor.snapshot()
+    print(f"\n   monitor.snapshot(): {(time.perf_counter() - start) * 1e3:.2f} ms")
+    print("="*72)
+
+
+def run_lean_benchmark(n=10000):
+    print("\n" + "="*72)
+    print(f"📈 LEAN BATCH MONITORING BENCHMARK ({n:,} emails per predict_lean call)")
+    print("="*72)
+    print(f"{'workload':>24} {'no monitor':>11} {'monitor':>10} {'record_many()':>14}")
+    
+    for name, emails in workloads(n).items():
+        classifier = EmailClassifier()
+        cleaned = [classifier.preprocess_text(e) for e in emails]
+        labels = ['General'] * n
+        confidences = [0.9] * n
+        
+        plain, _ = best_of(lambda: classifier.predict_lean(emails), repeat=3)
+        monitor = classifier.enable_monitoring(window_seconds=60)
+        monitored, _ = best_of(lambda: classifier.predict_lean(emails), repeat=3)
+        record_only, _ = best_of(lambda: monitor.record_many(cleaned, labels, confidences), repeat=3)
+        
+        print(f"{name:>24} {plain:>9.2f} s {monitored:>8.2f} s {record_only / n * 1e6:>11.1f} µs")
+    print("="*72)
+
+
+if __name__ == "__main__":
+    run_benchmark()
+    run_lean_benchmark()
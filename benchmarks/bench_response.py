@@ -0,0 +1,59 @@
+"""
+Response Serialization Benchmark
+Compares the full JSON batch response against the lean response mode
+"""
+
+import json
+
+from fastapi.encoders import jsonable_encoder
+
+from common import sample_emails, best_of
+from app.predictor import EmailClassifier
+from app.serialization import dumps_json
+
+
+def full_response(results):
+    """Serialize the way FastAPI renders the default batch response."""
+    content = {"success": True, "count": len(results), "predictions": results}
+    return json.dumps(jsonable_encoder(content)).encode('utf-8')
+
+
+def lean_response(result, include_probabilities=True):
+    """Serialize the lean batch response."""
+    content = {
+        "count": len(result['labels']),
+        "classes": result['classes'],
+        "labels": result['labels']
+    }
+    if include_probabilities:
+        content["probabilities"] = result['probabilities']
+    return dumps_json(content)
+
+
+def run_benchmark():
+    classifier = EmailClassifier()
+    
+    print("\n" + "="*72)
+    print("📦 RESPONSE SERIALIZATION BENCHMARK")
+    print("="*72)
+    print(f"{'items':>7} {'mode':<18} {'bytes':>12} {'bytes/item':>11} {'serialize ms':>13}")
+    
+    for n in (100, 10_000):
+        emails = sample_emails(n)
+        results = classifier.predict_batch(emails)
+        lean = classifier.predict_lean(emails)
+        
+        rows = [
+            ('full', lambda: full_response(results)),
+            ('lean', lambda: lean_response(lean)),
+            ('lean (labels)', lambda: lean_response(lean, include_probabilities=False)),
+        ]
+        for name, func in rows:
+            seconds, body = best_of(func)
+            print(f"{n:>7} {name:<18} {len(body):>12,} {len(body) / n:>11.1f} {seconds * 1000:>13.2f}")
+    
+    print("="*72)
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,62 @@
+"""
+Shadow Evaluation Benchmark
+Primary request latency with and without a shadow model attached
+"""
+
+import os
+import statistics
+import time
+
+from common import sample_emails
+from app.predictor import EmailClassifier
+from app.registry import ModelRegistry
+
+
+def primary_latency(registry, emails):
+    """Median per-request latency of the primary path in microseconds."""
+    timings = []
+    for email in emails:
+        start = time.perf_counter()
+        key, model = registry.resolve()
+        result = model.predict_batch([email])[0]
+        registry.submit_shadow(key, [email], [result.get('predicted_category')],
+                               time.perf_counter() - start, mode="full")
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings) * 1e6
+
+
+def run_benchmark():
+    emails = sample_emails(2000)
+    
+    registry = ModelRegistry()
+    registry.register('email-classifier', '1.0.0', EmailClassifier(), default=True)
+    without_shadow = primary_latency(registry, emails)
+    
+    registry.register('email-classifier', 'candidate', EmailClassifier())
+    
+    print("\n" + "="*72)
+    print("👥 SHADOW EVALUATION BENCHMARK")
+    print("="*72)
+    print(f"   CPU cores:                  {os.cpu_count()}")
+    print(f"   Primary latency, no shadow: {without_shadow:>8.1f} µs (median)")
+    
+    for sample_rate in (1.0, 0.1):
+        registry.set_shadow('email-classifier:candidate', max_queue=100, sample_rate=sample_rate)
+        registry.shadow.wait_ready()
+        with_shadow = primary_latency(registry, emails)
+        registry.shadow.join()
+        stats = registry.shadow.get_stats()
+        
+        print(f"\n   Shadow sample rate {sample_rate}:")
+        print(f"      Primary latency:          {with_shadow:>8.1f} µs (median)")
+        print(f"      Submitted / dropped:      {stats['submitted']} / {stats['dropped']}")
+        print(f"      Agreement rate:           {stats['agreement_rate']}")
+        print(f"      Primary latency recorded: {stats['primary_latency']}")
+        print(f"      Shadow latency recorded:  {stats['shadow_latency']}")
+    
+    registry.stop_shadow()
+    print("="*72)
+
+
+if __name__ == "__main__":
+    run_benchmark()
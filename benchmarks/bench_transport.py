@@ -0,0 +1,104 @@
+"""
+Batch Transport Benchmark
+Local round-trip of JSON vs MessagePack vs Arrow IPC batch payloads
+"""
+
+import json
+
+import msgpack
+import numpy as np
+import pyarrow as pa
+from fastapi.encoders import jsonable_encoder
+
+from common import sample_emails, best_of
+from app.predictor import EmailClassifier
+from app.serialization import (
+    dumps_json, MSGPACK_MEDIA_TYPE, ARROW_MEDIA_TYPE,
+    decode_batch_request, encode_batch_response
+)
+
+
+def json_full_round_trip(emails, results):
+    """Client JSON request -> server full JSON response -> client arrays."""
+    body = json.dumps({"emails": emails}).encode('utf-8')
+    server_emails = json.loads(body)["emails"]
+    content = {"success": True, "count": len(server_emails), "predictions": results}
+    response = json.dumps(jsonable_encoder(content)).encode('utf-8')
+    predictions = json.loads(response)["predictions"]
+    labels = [p.get('predicted_category') for p in predictions]
+    return len(body), len(response), labels
+
+
+def json_lean_round_trip(emails, lean):
+    """Client JSON request -> server lean JSON response -> client arrays."""
+    body = json.dumps({"emails": emails}).encode('utf-8')
+    json.loads(body)["emails"]
+    response = dumps_json({
+        "count": len(lean['labels']),
+        "classes": lean['classes'],
+        "labels": lean['labels'],
+        "probabilities": lean['probabilities']
+    })
+    decoded = json.loads(response)
+    matrix = np.array(decoded["probabilities"], dtype=np.float32)
+    return len(body), len(response), decoded["labels"], matrix
+
+
+def msgpack_round_trip(emails, lean):
+    """Client MessagePack request -> server MessagePack response -> client arrays."""
+    body = msgpack.packb({"emails": emails})
+    decode_batch_request(body, MSGPACK_MEDIA_TYPE)
+    response = encode_batch_response(lean, MSGPACK_MEDIA_TYPE)
+    decoded = msgpack.unpackb(response)
+    proba = decoded["probabilities"]
+    matrix = np.frombuffer(proba["data"], dtype=proba["dtype"]).reshape(proba["shape"])
+    return len(body), len(response), decoded["labels"], matrix
+
+
+def arrow_round_trip(emails, lean):
+    """Client Arrow request -> server Arrow response -> client arrays."""
+    table = pa.table({"email": pa.array(emails, type=pa.string())})
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    body = sink.getvalue()
+    decode_batch_request(body, ARROW_MEDIA_TYPE)
+    response = encode_batch_response(lean, ARROW_MEDIA_TYPE)
+    decoded = pa.ipc.open_stream(response).read_all()
+    probabilities = decoded.column("probabilities").combine_chunks()
+    matrix = probabilities.flatten().to_numpy().reshape(len(decoded), probabilities.type.list_size)
+    return body.size, len(response), decoded.column("label"), matrix
+
+
+def run_benchmark():
+    classifier = EmailClassifier()
+    
+    print("\n" + "="*76)
+    print("🚚 BATCH TRANSPORT ROUND-TRIP BENCHMARK (inference excluded)")
+    print("="*76)
+    print(f"{'items':>7} {'transport':<12} {'request B':>12} {'response B':>12} {'round-trip ms':>14} {'vs json':>8}")
+    
+    for n in (1_000, 10_000):
+        emails = sample_emails(n)
+        inference_seconds, lean = best_of(lambda: classifier.predict_lean(emails), repeat=1)
+        results = classifier.predict_batch(emails)
+        
+        rows = [
+            ('json', lambda: json_full_round_trip(emails, results)),
+            ('json lean', lambda: json_lean_round_trip(emails, lean)),
+            ('msgpack', lambda: msgpack_round_trip(emails, lean)),
+            ('arrow', lambda: arrow_round_trip(emails, lean)),
+        ]
+        baseline = None
+        for name, func in rows:
+            seconds, (request_bytes, response_bytes, *_) = best_of(func)
+            baseline = baseline or seconds
+            print(f"{n:>7} {name:<12} {request_bytes:>12,} {response_bytes:>12,} "
+                  f"{seconds * 1000:>14.2f} {baseline / seconds:>7.1f}x")
+        print(f"{n:>7} {'(inference)':<12} {'':>12} {'':>12} {inference_seconds * 1000:>14.2f}")
+    
+    print("="*76)
+
+
+if __name__ == "__main__":
+    run_benchmark()
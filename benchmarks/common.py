@@ -0,0 +1,49 @@
+"""
+Shared helpers for the benchmark scripts
+"""
+
+import os
+import random
+import sys
+import time
+
+# Add project root to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+SAMPLE_EMAILS = [
+    "URGENT: Server is down! Need immediate action to restore services.",
+    "Please review the Q3 financial report and budget allocation.",
+    "HR Department: New employee onboarding scheduled for Monday.",
+    "Team meeting rescheduled to Thursday afternoon.",
+    "ASAP: Client deadline is tomorrow! We need to finalize the proposal immediately.",
+    "The invoice for last month's vendor payment is attached for your records.",
+    "Reminder: benefits enrollment closes next week, contact human resources with questions.",
+    "Thanks for the update, let's discuss the project plan over lunch.",
+]
+
+FILLER_WORDS = [
+    "project", "update", "meeting", "report", "schedule", "client", "review",
+    "office", "forward", "attached", "question", "group", "gas", "power",
+    "trading", "deal", "market", "contract", "team", "week", "call", "notes",
+]
+
+
+def sample_emails(n, seed=42):
+    """Build n synthetic emails from the sample templates plus random filler words."""
+    rng = random.Random(seed)
+    emails = []
+    for _ in range(n):
+        filler = ' '.join(rng.choice(FILLER_WORDS) for _ in range(rng.randint(10, 60)))
+        emails.append(f"{rng.choice(SAMPLE_EMAILS)} {filler}")
+    return emails
+
+
+def best_of(func, repeat=5):
+    """Run func repeat times and return (best seconds, last result)."""
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result